@@ -1,4 +1,5 @@
-from typing import Any, Union, Tuple, List, Optional, Dict
+from typing import Any, Union, Tuple, List, Optional, Dict, Iterator
+from itertools import chain
 import random
 
 def is_nested_empty_list(lst: Any) -> bool:
@@ -27,6 +28,19 @@ def is_nested_empty_list(lst: Any) -> bool:
     """
     return isinstance(lst, list) and (not lst or all(is_nested_empty_list(item) for item in lst))
 
+def _iter_flat(nested_list: List[List[Any]]) -> Iterator[Any]:
+    """
+    Iterates over the items of a nested list of depth 2 without building a flattened copy.
+
+    Used in: validate_lengths.
+
+    Example Usage:
+        >>> list(_iter_flat([["file1", "file2"], ["file3"]]))
+        ['file1', 'file2', 'file3']
+    """
+    # chain.from_iterable streams the sublists, unlike chain(*nested_list) which unpacks them all into call arguments
+    return chain.from_iterable(nested_list)
+
 def validate_lengths(nested_list: list[list[str]], list1: list[bool], list2: list[bool] = None) -> bool:
     """
     Validates if the number of values in a nested list of depth 2 matches the lengths of two other flat boolean lists.
@@ -82,14 +96,13 @@ def validate_lengths(nested_list: list[list[str]], list1: list[bool], list2: lis
         result = validate_lengths(nested_list, list1)
         print(result)  # Should print False
     """
-    # Flatten the nested list and get the count of values
-    flat_list = [item for sublist in nested_list for item in sublist]
-    nested_list_count = len(flat_list)  # Count of all items in the flattened nested list
-
-    # Check if all values in the nested list are strings
-    if not all(isinstance(item, str) for item in flat_list):
+    # Check if all values in the nested list are strings, streaming over the nested list instead of flattening it
+    if not all(isinstance(item, str) for item in _iter_flat(nested_list)):
         return True  # Return True if any item in the nested list is not a string
 
+    # Get the count of values in the nested list
+    nested_list_count = sum(map(len, nested_list))  # Count of all items in the nested list, e.g. [["a", "b"], ["c"]] -> 3
+
     # Check if all values in list1 are booleans
     if not all(isinstance(item, bool) for item in list1):
         return True  # Return True if any item in list1 is not a boolean
@@ -211,7 +224,8 @@ def generate_and_count_lists(
     test_file_names_values: List[List[str]],
     record_output_values: Union[str, bool], 
     record_test_output_values: Union[str, bool], 
-    run_tests_values: Union[str, bool]
+    run_tests_values: Union[str, bool],
+    rng: Optional[random.Random] = None
 ) -> Tuple[List[Union[bool]], List[Union[bool]], List[Union[bool]]]:
     """
     Generate record lists based on provided flags and count elements in nested lists.
@@ -229,6 +243,8 @@ def generate_and_count_lists(
     - record_output_values: Flag to generate the record output list ("Mix", True, or False).
     - record_test_output_values: Flag to generate the record test output list ("Mix", True, or False).
     - run_tests_values: Flag to generate the run tests list ("Mix", True, or False).
+    - rng: Random number generator used for the "Mix" lists. Pass a seeded random.Random for reproducible
+      lists, defaults to the module-level random functions.
 
     Returns:
     - Tuple with:
@@ -281,29 +297,31 @@ def generate_and_count_lists(
         "Invalid value for record flag"
     """
 
-    # Function to count elements in nested lists
-    def count_elements(nested_list: List[List[str]]) -> int:
+    # Function to validate a nested list and count its elements in a single pass
+    def validate_and_count(nested_list: List[List[str]], name: str) -> int:
+        # Check that the list is not empty, e.g. []
+        if not nested_list:
+            raise ValueError(f"{name} cannot be empty or contain empty lists")  # Raise error
         count = 0  # Initialize count to zero
+        has_files = False  # Whether any sublist holds files, i.e. the list isn't a nested empty list like [[]] or [[[]]]
         for sublist in nested_list:  # Iterate over each sublist
             if not isinstance(sublist, list):  # Check if sublist is a list
                 raise ValueError("Invalid nested list structure")  # Raise error if not
             count += len(sublist)  # Add the length of each sublist to the count
+            # is_nested_empty_list returns at the first file name, so this is O(1) for a regular sublist like ['a.py', 'b.py']
+            has_files = has_files or not is_nested_empty_list(sublist)
+        if not has_files:  # Check if the list only contains empty lists
+            raise ValueError(f"{name} cannot be empty or contain empty lists")  # Raise error
         return count  # Return the total count
-    
-    # Validate input lists
-    if not files_by_directory_values or is_nested_empty_list(files_by_directory_values):  # Check if files_by_directory_values is empty or contains empty lists
-        raise ValueError("files_by_directory_values cannot be empty or contain empty lists")  # Raise error
-    if not test_file_names_values or is_nested_empty_list(test_file_names_values):  # Check if test_file_names_values is empty or contains empty lists
-        raise ValueError("test_file_names_values cannot be empty or contain empty lists")  # Raise error
 
-    # Calculate the number of elements in provided values
-    files_by_directory_count = count_elements(files_by_directory_values)  # Count elements in files_by_directory_values
-    test_file_names_count = count_elements(test_file_names_values)  # Count elements in test_file_names_values
+    # Validate the input lists and calculate the number of elements in them
+    files_by_directory_count = validate_and_count(files_by_directory_values, "files_by_directory_values")  # Count elements in files_by_directory_values
+    test_file_names_count = validate_and_count(test_file_names_values, "test_file_names_values")  # Count elements in test_file_names_values
 
     # Generate lists based on record_output_values, record_test_output_values, and run_tests_values
     def generate_record_list(values: Union[str, bool], count: int) -> List[Union[bool]]:
         if values == "Mix":  # If the flag is "Mix"
-            return [random.choice([True, False]) for _ in range(count)]  # Generate a mixed list of True and False
+            return (rng or random).choices((True, False), k=count)  # Generate a mixed list of True and False in a single call
         elif values is True:  # If the flag is True
             return [True] * count  # Generate a list of True values
         elif values is False:  # If the flag is False
@@ -1,7 +1,5 @@
 from pathlib import Path
 from typing import  List, Optional, Dict, Any, Tuple
-from aider.coders import Coder
-from aider.io import InputOutput
 import os
 
 # Modules within this project 
@@ -44,6 +42,11 @@ def aider_runner(directory: str, files_by_directory: List[str], model: Any, inst
         if not os.path.isfile(fname):
             raise FileNotFoundError(f"File '{fname}' does not exist.")
     
+    # Import aider only when files are edited, importing it loads its whole dependency tree (LiteLLM, tokenizers, ...),
+    # so code that only validates the inputs or runs the scripts doesn't pay for it
+    from aider.coders import Coder
+    from aider.io import InputOutput
+
     # Create InputOutput object with yes set to True
     # This means that any prompts asking for user confirmation will automatically be answered 'yes'
     # It's useful for automated or batch processing where you don't want to manually confirm every action
@@ -91,7 +94,10 @@ def execute(directory_paths: List[str],
         instructions (List[str]): The list of instructions to run on the files. Defaults to None.
 
     Raises:
-        Exception: If there is an error in the processing or if model is not provided.
+        ValueError: If the directory paths, file lists or flags are invalid, or if run_tests_flag and test_file_names 
+                    are provided without record_test_output_values.
+        FileNotFoundError: If a directory or file passed to aider does not exist.
+        RuntimeError: If a script or test file exits with a non-zero status.
 
     Returns:
         Tuple[Dict[str, Any], Dict[str, Any]]: A tuple containing dictionaries of script and test outputs.
@@ -175,6 +181,10 @@ def execute(directory_paths: List[str],
 
         # Validate the test file names and record test output values lengths if run_tests_flag and test_file_names are provided
         if run_tests_flag is not None and test_file_names is not None:
+            # record_test_output_values is needed to know which test outputs to record
+            # Example: run_tests_flag = [False], test_file_names = [["test_file1.py"]], record_test_output_values = None -> ValueError
+            if record_test_output_values is None:
+                raise ValueError("record_test_output_values must be provided when run_tests_flag and test_file_names are provided")
             # Ensure run_tests_flag and record_test_output_values contain only boolean values
             if not all(isinstance(flag, bool) for flag in run_tests_flag):
                 raise ValueError("run_tests_flag must contain boolean values")
@@ -1,4 +1,5 @@
 import subprocess
+import sys
 from typing import Dict, Optional, Tuple
 
 def run_script_and_record_output(script_path: Optional[str] = None, 
@@ -20,7 +21,7 @@ def run_script_and_record_output(script_path: Optional[str] = None,
         Tuple[Dict[str, str], Dict[str, Dict[str, str]]]: A tuple containing dictionaries of script and test outputs.
 
     Raises:
-        Exception: If there is an error running the script or test file.
+        RuntimeError: If the script or test file exits with a non-zero status.
 
     Example Usage:
         >>> # Running a script and recording its output, as well as running a test file and recording its output
@@ -74,30 +75,37 @@ def run_script_and_record_output(script_path: Optional[str] = None,
         # If script_path is not None and we want to record the script's output
         if script_path and record_output:
             # Run the script using subprocess, capturing its output
-            script_result = subprocess.run(["python", script_path], capture_output=True, text=True, check=True)
+            # The script runs with the current interpreter, the same one that runs its tests below
+            # Example: ["/usr/bin/python3.12", "dir1/file1.py"]
+            script_result = subprocess.run([sys.executable, script_path], capture_output=True, text=True, check=True)
             # Store the script's standard output and error messages
             script_output["stdout"] = script_result.stdout
             script_output["stderr"] = script_result.stderr
         elif script_path:
             # If not recording output, just run the script without capturing output
-            subprocess.run(["python", script_path], check=True)
+            subprocess.run([sys.executable, script_path], check=True)
     
         # If there is a test file to run and run_tests_values is True
         if test_file_path and run_tests_values:
-            test_result = subprocess.run(["pytest", test_file_path], capture_output=True, text=True, check=True)
+            # Run the test file once using pytest, its output is only captured if we want to record it
+            # subprocess.run blocks on the process until it exits, there is no polling
+            # pytest is run as a module of the current interpreter, like the script above, so it doesn't depend on 
+            # which "pytest" executable comes first on PATH and skips the console script wrapper
+            # The cache plugin is disabled so the run doesn't write a .pytest_cache directory next to the test file,
+            # the runner never uses --lf/--ff so the cache would only cost writes
+            # Example: ["/usr/bin/python3.12", "-m", "pytest", "-p", "no:cacheprovider", "dir1/test_file1.py"]
+            test_result = subprocess.run([sys.executable, "-m", "pytest", "-p", "no:cacheprovider", test_file_path], 
+                                         capture_output=record_test_output, text=True, check=True)
             # If we want to record the test's output
             if record_test_output:
-                # Run the test using pytest, capturing its output
                 # Store the test's standard output and error messages
                 test_outputs["stdout"] = test_result.stdout
                 test_outputs["stderr"] = test_result.stderr
-            else:
-                # If not recording output, just run the test without capturing output
-                subprocess.run(["pytest", test_file_path], check=True)
     
     except subprocess.CalledProcessError as e:
-        # If an error occurs, raise an exception with the error message
-        raise Exception(f"Error running the script or test file: {e}")
+        # If an error occurs, raise a RuntimeError with the error message, chained to the CalledProcessError
+        # Example: "Error running the script or test file: Command '['/usr/bin/python3.12', 'missing.py']' returned non-zero exit status 2."
+        raise RuntimeError(f"Error running the script or test file: {e}") from e
     
     # Return the script's output and the test outputs
     return script_output, test_outputs
@@ -38,7 +38,25 @@ def list_files(directory: str, print_files: bool = False) -> List[str]:
         # If not, raise an error indicating the problem
         raise ValueError(f"{directory} is not a valid directory.")
     # List all files in the directory and its subdirectories
-    files = [str(file.name) for file in p.rglob('*') if file.is_file()]
+    # os.scandir returns DirEntry objects that cache their type from the directory listing, so unlike 
+    # Path.rglob + is_file() there is no extra stat call per entry. Subdirectories are walked with an explicit stack
+    # Example: directory/a.py, directory/sub/b.py -> ["a.py", "b.py"]
+    files = []
+    stack = [directory]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except PermissionError:
+            # Skip subdirectories that can't be read, like rglob does
+            # Example: directory/private (mode 000) -> its files are left out, the walk continues
+            continue
+        with entries:
+            for entry in entries:
+                # Like rglob, descend into real subdirectories only, symlinked directories are not followed
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    files.append(entry.name)
     
     if print_files:
         print(f"Directory: {Path(directory).resolve()}")
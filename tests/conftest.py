@@ -0,0 +1,117 @@
+import os
+import time
+import random
+import pytest
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+'''
+Shared fixtures for the test suite.
+
+Fixtures:
+1. api_rate_limiter: Session-wide limiter that spaces out test cases which call the remote OpenRouter model.
+2. vcr_config: pytest-recording settings for the cassettes that record and replay the OpenRouter API calls.
+3. rng: Seeded random number generator for the tests that generate random inputs.
+
+Tests marked with @pytest.mark.slow call the remote model and are skipped unless pytest is run with --runslow.
+'''
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    # Add the --runslow option, e.g. pytest --runslow
+    parser.addoption("--runslow", action="store_true", default=False, help="run the slow tests that call the remote OpenRouter model")
+
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]) -> None:
+    # Run everything when --runslow is passed
+    if config.getoption("--runslow"):
+        return
+    # Otherwise skip the tests marked as slow
+    skip_slow = pytest.mark.skip(reason="calls the remote model, use --runslow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+class RateLimiter:
+    """
+    Allows at most `max_calls` calls to the remote model in any window of `period` seconds.
+
+    Purpose: Replaces an unconditional time.sleep(1) per test case. The timestamps of the recent calls
+    are kept in a deque, and wait() only sleeps when the window is already full, so short bursts of 
+    cases run back to back while the average rate stays at max_calls / period. Tests that never 
+    contact the API (e.g. test_execute_validation, the exception cases of test_aider_runner) don't 
+    use the limiter at all.
+
+    Args:
+        max_calls (int): Maximum number of calls in a window. Defaults to 1.
+        period (float): Length of the window in seconds. Defaults to 1.0.
+
+    Example Usage:
+        >>> limiter = RateLimiter(max_calls=2, period=1.0)
+        >>> limiter.wait()  # Returns immediately
+        >>> limiter.wait()  # Returns immediately, the window now holds 2 calls
+        >>> limiter.wait()  # Sleeps until the first call is 1 second old
+    """
+    def __init__(self, max_calls: int = 1, period: float = 1.0) -> None:
+        self.max_calls = max_calls
+        self.period = period
+        # Timestamps of the calls in the current window, oldest first
+        self.calls: Deque[float] = deque()
+
+    def wait(self) -> None:
+        # Drop the calls that are older than the window
+        now = time.monotonic()
+        while self.calls and now - self.calls[0] >= self.period:
+            self.calls.popleft()
+        # Sleep only when the window is full, until its oldest call leaves it
+        if len(self.calls) >= self.max_calls:
+            time.sleep(self.period - (now - self.calls.popleft()))
+        # Record the time of this call
+        self.calls.append(time.monotonic())
+
+
+@pytest.fixture(scope="session")
+def api_rate_limiter() -> RateLimiter:
+    """
+    Fixture providing a single RateLimiter shared by every test in the session. Each pytest-xdist worker
+    runs its own session, so every worker gets its own limiter.
+
+    Returns:
+        RateLimiter: The shared rate limiter.
+    """
+    # Allows bursts of up to 5 back to back calls, looser than the previous one call per second,
+    # while any 5 second window still holds at most 5 calls
+    return RateLimiter(max_calls=5, period=5.0)
+
+
+@pytest.fixture(scope="module")
+def vcr_config() -> Dict[str, Any]:
+    """
+    Fixture providing the VCR.py settings used by pytest-recording for tests marked with @pytest.mark.vcr.
+
+    Purpose: The first run of a test with OPENROUTER_API_KEY set records its API calls to
+    tests/cassettes/<test module>/<test name>.yaml (--record-mode=once in pytest.ini), and later runs
+    replay them from disk without contacting OpenRouter. Run pytest with --record-mode=rewrite to re-record.
+
+    Returns:
+        Dict[str, Any]: The keyword arguments passed to VCR.py.
+    """
+    # Scrub the API key from the recorded requests so cassettes can be committed
+    # Example: "Authorization: Bearer sk-or-..." -> the header is dropped from the cassette
+    return {"filter_headers": ["authorization"]}
+
+
+@pytest.fixture
+def rng() -> random.Random:
+    """
+    Fixture providing a random number generator with a fixed seed, so randomly generated inputs 
+    (e.g. generate_nested_lists, the "Mix" lists of generate_and_count_lists) are the same on every run.
+
+    The seed can be changed with the PYTEST_SEED environment variable to try other inputs, and a failure 
+    is reproduced by running again with the same value.
+    Example: PYTEST_SEED=42 pytest tests/test_execute_helper.py
+
+    Returns:
+        random.Random: A new generator seeded with PYTEST_SEED (decimal or 0x hex), or 0xC0FFEE if it isn't set, for each test.
+    """
+    # int(..., 0) accepts both "42" and "0xC0FFEE"
+    return random.Random(int(os.environ.get("PYTEST_SEED", "0xC0FFEE"), 0))
@@ -176,7 +176,7 @@ def test_check_nested_lists_and_flat_list(list1, list2, flat_list, expected):
         ),
     ]
 )
-def test_generate_and_count_lists(files_by_directory_values, test_file_names_values, record_output_values, record_test_output_values, run_tests_values, expected_output, raises_exception):
+def test_generate_and_count_lists(files_by_directory_values, test_file_names_values, record_output_values, record_test_output_values, run_tests_values, expected_output, raises_exception, rng):
     """
     Combined test for generate_and_count_lists function.
 
@@ -188,6 +188,7 @@ def test_generate_and_count_lists(files_by_directory_values, test_file_names_val
         run_tests_values: Flag to determine how to generate the run tests list. Can be "Mix", True, or False.
         expected_output: Expected output of the function.
         raises_exception: Whether the function is expected to raise an exception.
+        rng: Seeded random number generator fixture used for the "Mix" lists.
     """
     # Check if we expect an exception to be raised
     if raises_exception:
@@ -195,38 +196,59 @@ def test_generate_and_count_lists(files_by_directory_values, test_file_names_val
             # Call the function and expect it to raise ValueError
             generate_and_count_lists(
                 files_by_directory_values, test_file_names_values,
-                record_output_values, record_test_output_values, run_tests_values
+                record_output_values, record_test_output_values, run_tests_values, rng
             )
     else:
         # Call the function and store the result
         result = generate_and_count_lists(
             files_by_directory_values, test_file_names_values,
-            record_output_values, record_test_output_values, run_tests_values
+            record_output_values, record_test_output_values, run_tests_values, rng
         )
 
-        # List of input flags and corresponding results to check
-        flags_and_results = [
-            (record_output_values, result[0], expected_output[0] if expected_output else None),
-            (record_test_output_values, result[1], expected_output[1] if expected_output else None),
-            (run_tests_values, result[2], expected_output[2] if expected_output else None)
-        ]
-
-        # Iterate over each flag and its corresponding result list
-        for flag, res_list, expected_list in flags_and_results:
+        # Pair each input flag with its result list and expected list, expected_output is None for the generated cases
+        expected_lists = expected_output or (None, None, None)
+        for flag, res_list, expected_list in zip((record_output_values, record_test_output_values, run_tests_values), result, expected_lists):
             # If the flag is "Mix", check if all elements are booleans
             if flag == "Mix":
-                assert all(isinstance(x, bool) for x in res_list)
-            # If the flag is True, check if all elements are True
-            elif flag is True:
-                assert all(x is True for x in res_list)
-            # If the flag is False, check if all elements are False
-            elif flag is False:
-                assert all(x is False for x in res_list)
-            # Verify the output list matches the expected list when flag is True or False
+                assert all(type(x) is bool for x in res_list)
+            # If the flag is True or False, check that every element is that bool, `is` so 1 or 0 don't pass as True or False
+            elif flag is True or flag is False:
+                assert all(x is flag for x in res_list)
+            # Verify the output list matches the expected list otherwise
             else:
                 assert res_list == expected_list
                 
 
+@pytest.mark.parametrize("scale", [1, 32, 1024])
+@pytest.mark.parametrize("flag", ["Mix", True, False])
+def test_generate_and_count_lists_scale(scale, flag, rng):
+    """
+    Test generate_and_count_lists with inputs of growing size, so changes to the counting and list 
+    generation are measurable. The inputs have `scale` directories with `scale` files each.
+
+    Args:
+        scale: Number of directories and number of files per directory, e.g. 32 -> 32 * 32 = 1024 files.
+        flag: The flag passed for all three lists ("Mix", True, or False).
+        rng: Seeded random number generator fixture used for the "Mix" lists.
+    """
+    # Build the nested lists, e.g. scale = 2 -> [['f0.py', 'f0.py'], ['f1.py', 'f1.py']]
+    files_by_directory_values = [[f"f{i}.py"] * scale for i in range(scale)]
+    test_file_names_values = [[f"test_f{i}.py"] * scale for i in range(scale)]
+
+    result = generate_and_count_lists(files_by_directory_values, test_file_names_values, flag, flag, flag, rng)
+
+    # Every list has one flag per file
+    assert [len(res_list) for res_list in result] == [scale * scale] * 3
+
+    # Check the contents only for the small inputs, the large ones only check the lengths
+    if scale <= 32:
+        for res_list in result:
+            if flag == "Mix":
+                assert all(isinstance(x, bool) for x in res_list)
+            else:
+                assert all(x is flag for x in res_list)
+
+
 @pytest.mark.parametrize("files_by_directory, test_file_names, record_output_flag, run_tests_flag, record_test_output_values, expected", [
     # Test Case 1: Regular and test files distributed across two directories
     (
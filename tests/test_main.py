@@ -18,9 +18,15 @@ Fixtures:
 
 Parameterization:
 Tests are parameterized to cover various flag settings and input combinations using `pytest.mark.parametrize`.
+The execute cases are hand-picked rather than a full product of the input axes: every case of test_execute 
+calls the remote model, so each one covers a different combination of the record_output_flag, run_tests_flag 
+and record_test_output_values settings (all True, all False, mixed).
 
 Tests:
-1. test_execute_combined: Tests the execute function with different combinations of inputs and flags, including handling invalid inputs and edge cases.
+1. test_execute: Tests the execute function against the remote model with different combinations of flags, replayed from the
+   recorded cassettes (skipped when a case has no cassette and OPENROUTER_API_KEY is not set).
+2. test_execute_wiring: Tests how execute passes short sentinel instructions to a mocked aider_runner and runs the edited scripts, without the network.
+3. test_execute_validation: Tests that the execute function rejects invalid inputs and edge cases before calling the model.
 '''
 
 import pytest
@@ -28,23 +34,29 @@ import pytest
 from Aider_Project.main import execute, aider_runner  # Import the execute function from main.py
 from Aider_Project.execute_helper import is_nested_empty_list # Import helper functions
 import random
-from typing import Any, List, Union, Dict, Generator
+from typing import Any, List, Optional, Union, Dict, Mapping, TYPE_CHECKING
 from pathlib import Path
 import ast
-import tempfile
 import shutil  # Import shutil for directory removal
 import os
 import sys
 import io
 import textwrap
-import time 
+import re
+import hashlib
+from types import MappingProxyType
 from unittest.mock import patch, Mock
 
-# For testing Aider package functionality
-from aider.models import Model
-from aider.coders import Coder
+# Run every test of this module on the same pytest-xdist worker (--dist=loadgroup in pytest.ini), so the tests that 
+# call the remote model share one api_rate_limiter and the session fixtures are built once
+pytestmark = pytest.mark.xdist_group("openrouter")
 
-def generate_nested_lists() -> list:
+# For testing Aider package functionality, aider is imported by the model fixtures so tests 
+# selected with -k that don't need a model (e.g. test_extract_classes_and_functions) don't import it
+if TYPE_CHECKING:
+    from aider.models import Model
+
+def generate_nested_lists(rng: Optional[random.Random] = None) -> list:
     """
     Generates a nested list structure that can be either an empty list or 
     a list with multiple levels of nested empty lists.
@@ -53,27 +65,39 @@ def generate_nested_lists() -> list:
     files_by_directory_values (filenames to be used for editing, context, running and getting the output from terminal when the module is ran)
     and for test_file_names_values (test filenames for context, running and getting the output from terminal when the tests are ran).
 
-    Found in: The test_generate_nested_lists function, and the combination variable declaration in files_by_directory_values 
-    and test_file_names_values test case.
+    Found in: The test_generate_nested_lists function, which passes the seeded rng fixture from conftest.py.
     
+    Args:
+        rng (random.Random, optional): Random number generator to draw from. Defaults to None, in which case a new 
+                                       random.Random(0) is used, so every call without an rng returns the same 
+                                       structure. Pass a seeded generator (e.g. the rng fixture) and reuse it 
+                                       across calls to get different structures that are still reproducible.
+
     Returns:
         list: A nested list which is either an empty list or contains 
               multiple levels of nested empty lists.
 
     Example Usage:
-        >>> nested_list = generate_nested_lists()
-        >>> print(nested_list)
+        >>> generate_nested_lists()  # Always the random.Random(0) structure
+        [[[], [[], []], [[], [], [], []]], [[[], [], []], [[], []], [[], [], []]], [[[], [], [], []], [[]]]]
+        >>> generate_nested_lists(random.Random(1))
         []
-        >>> print(generate_nested_lists())
-        [[[[]]], [[], []]]
+        >>> generate_nested_lists(random.Random(22))
+        [[[]]]
     """
     # Randomly choose to return either an empty list or a nested lists with varying depths that are also each empty
-    return [] if random.choice([True, False]) else [[[[] for _ in range(random.randint(0, 4))] for _ in range(random.randint(0, 4))] for _ in range(random.randint(0, 4))]
+    rng = rng or random.Random(0)
+    # Draw a single random bit to choose the empty list, instead of choosing from a [True, False] list
+    if not rng.getrandbits(1):
+        return []
+    # randrange(5) draws the same 0 to 4 sizes as randint(0, 4) without its argument handling
+    randrange = rng.randrange
+    return [[[[] for _ in range(randrange(5))] for _ in range(randrange(5))] for _ in range(randrange(5))]
 
 
 def extract_classes_and_functions(file_path: str) -> Dict[str, Union[List[str], None]]:
     """
-    Extracts class and function names from a given Python file.
+    Extracts the top-level class and function names from a given Python file, with the methods of each class.
 
     Purpose: This function helps in testing by extracting class and function names from a file, 
     allowing verification of whether the file contains the specified classes and functions.
@@ -89,6 +113,10 @@ def extract_classes_and_functions(file_path: str) -> Dict[str, Union[List[str],
         Dict[str, Union[List[str], None]]: A dictionary containing class names and their respective function names,
                                            and standalone function names as keys with None as their value.
 
+    Raises:
+        SyntaxError: If the file contains the def or class keywords and isn't valid Python. A file without
+                     either keyword returns {} without being parsed, so its syntax errors aren't reported.
+
     Example Usage:
         >>> extract_classes_and_functions('/absolute/path/to/test_file.py')
         {
@@ -120,215 +148,203 @@ def extract_classes_and_functions(file_path: str) -> Dict[str, Union[List[str],
         {}
         # Explanation: This file contains no classes or functions.
     """
-    # Open the specified Python file in read mode with UTF-8 encoding
-    with open(file_path, 'r', encoding='utf-8') as file:
-        # Parse the file content into an abstract syntax tree (AST)
-        tree = ast.parse(file.read(), filename=file_path)
+    # Read the source once, its SHA-256 digest is the cache key so any edit (even one that keeps the size 
+    # and lands within the mtime granularity) misses the cache, and identical files share one parse
+    with open(file_path, 'rb') as file:
+        source = file.read()
+    # An empty file, or one without the def/class keywords anywhere, can't define anything, so skip hashing and parsing.
+    # The file isn't parsed at all, so a syntax error in it is not raised
+    # Example: b"" -> {}, b"# Only comments\nx = 1\n" -> {}, b"x = (" -> {}
+    if b"def" not in source and b"class" not in source:
+        return {}
+    digest = hashlib.sha256(source).hexdigest()
+    # Example: "def f(): pass\n" -> "5d2b4f..." 
+    if digest not in _EXTRACT_CACHE:
+        _EXTRACT_CACHE[digest] = _extract_from_source(source, os.path.abspath(file_path))
+    # Return a copy, so a caller that mutates the result (or its method lists) can't change the cached entry
+    # Example: {"Second": ["method"]} -> a new dict with a new ["method"] list
+    return {name: (list(methods) if methods is not None else None) for name, methods in _EXTRACT_CACHE[digest].items()}
+
+# Results of extract_classes_and_functions keyed by the SHA-256 digest of the file contents.
+# Callers get a copy of the cached dictionaries, the entries themselves are never handed out.
+_EXTRACT_CACHE: Dict[str, Dict[str, Union[List[str], None]]] = {}
+
+def _extract_from_source(source: bytes, file_path: str) -> Dict[str, Union[List[str], None]]:
+    """
+    Parses the source of a Python file and scans it for extract_classes_and_functions.
+
+    Args:
+        source (bytes): The contents of the Python file.
+        file_path (str): The absolute path to the Python file, only used in syntax error messages.
+
+    Returns:
+        Dict[str, Union[List[str], None]]: See extract_classes_and_functions.
+    """
+    # Compile the bytes straight into an abstract syntax tree (AST), the parser decodes the source itself 
+    # (UTF-8 or the file's coding cookie). This is the compile() call behind ast.parse, without type comments
+    # and without inheriting the __future__ flags of this module
+    tree = compile(source, file_path, 'exec', flags=ast.PyCF_ONLY_AST, dont_inherit=True)
     
     # Initialize an empty dictionary to hold class names and their functions
     classes_and_functions = {}
     
-    # Initialize a set to hold names of methods to avoid counting them as standalone functions
-    method_names = set()
-    
-    # Walk through all nodes in the AST
-    for node in ast.walk(tree):
+    # The parser only creates the exact ast node classes, so `type(node) is` checks are enough 
+    # and skip isinstance's subclass lookup. The classes are kept in locals for the loop
+    class_def, function_def = ast.ClassDef, ast.FunctionDef
+
+    # Scan only the top-level statements of the module, methods are read from each class body, 
+    # so function bodies and expressions are never visited
+    for node in tree.body:
+        node_type = type(node)
         # Check if the node is a class definition
-        if isinstance(node, ast.ClassDef):
-            class_name = node.name  # Get the name of the class
-            # Get all function names within the class
-            function_names = [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
-            # Add the class name and its functions to the dictionary
-            classes_and_functions[class_name] = function_names
-            # Add all function names to the set of method names
-            method_names.update(function_names)
-        # Check if the node is a standalone function definition and not a method
-        elif isinstance(node, ast.FunctionDef):
-            # If the function name is not in the set of method names, it is a standalone function
-            if node.name not in method_names:
-                classes_and_functions[node.name] = None
+        if node_type is class_def:
+            # Add the class name and the names of the functions within the class to the dictionary
+            classes_and_functions[node.name] = [n.name for n in node.body if type(n) is function_def]
+        # Check if the node is a standalone function definition
+        elif node_type is function_def:
+            classes_and_functions[node.name] = None
     
     # Return the dictionary containing class names with their functions and standalone functions
     return classes_and_functions
 
-def adjust_outputs(outputs: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
-    """
-    Adjust outputs for comparison by consistently formatting directory paths
-    to include the last two parts of the file path. Use for formatting the execute() functions 
-    returns and used in the test_execute() function, to make simplified assertions.  
+# Matches everything before the last two components of a path, with either "/" or "\\" as separator
+# Example: "/tmp/pytest-of-user/pytest-198/dir1/file1.py" -> group(1) = "dir1/file1.py"
+_DIR_MASK_RE = re.compile(r"^.*?([^/\\]+[/\\][^/\\]+)$")
 
-    Args:
-        outputs (dict): The dictionary of outputs to adjust.
-
-    Returns:
-        dict: Adjusted outputs.
-
-    Example usage:
-        # Basic test output with directory paths adjusted
-        outputs_1 = {
-            "dir1/test_file1.py": {"stdout": "Test output 1", "stderr": ""},
-            "dir2/test_file3.py": {"stdout": "Test output 2", "stderr": ""}
-        }
-        adjusted_outputs_1 = adjust_outputs(outputs_1)
-        # Expected output: {'dir1/test_file1.py': {'stdout': 'Test output 1', 'stderr': ''}, 'dir2/test_file3.py': {'stdout': 'Test output 2', 'stderr': ''}}
-
-        # Script output with adjusted directory paths
-        outputs_2 = {
-            "/tmp/pytest-of-user/pytest-198/test_execute_None_files_by_dir0/dir1/file1.py": {"stdout": "Script output 1", "stderr": ""},
-            "/tmp/pytest-of-user/pytest-198/test_execute_None_files_by_dir0/dir2/file3.py": {"stdout": "Script output 2", "stderr": ""}
-        }
-        adjusted_outputs_2 = adjust_outputs(outputs_2)
-        # Expected output: {'dir1/file1.py': {'stdout': 'Script output 1', 'stderr': ''}, 'dir2/file3.py': {'stdout': 'Script output 2', 'stderr': ''}}
-
-        # Test output with stderr containing lines to be filtered
-        outputs_3 = {
-            "dir1/test_file1.py": {"stdout": "Test output 1", "stderr": "Debugger warning\nSome other error\nDebugging issue"},
-            "dir2/test_file3.py": {"stdout": "Test output 2", "stderr": "Frozen modules warning\nAnother error"}
-        }
-        adjusted_outputs_3 = adjust_outputs(outputs_3)
-        # Expected output: {'dir1/test_file1.py': {'stdout': 'Test output 1', 'stderr': 'Some other error'}, 'dir2/test_file3.py': {'stdout': 'Test output 2', 'stderr': 'Another error'}}
-    """
-    adjusted_outputs: Dict[str, Dict[str, str]] = {}
-    
-    for key, value in outputs.items():
-        # Adjust the key to include the last two parts of the file path
-        # Example: "C:/path/to/dir1/file1.py" -> "dir1/file1.py"
-        adjusted_key = "/".join(Path(key).parts[-2:])  # Example: "dir1/file1.py"
-        
-        adjusted_outputs[adjusted_key] = value
-    
-        # Remove lines containing "debugger", "debugging", or "frozen modules" from stderr
-        if 'stderr' in adjusted_outputs[adjusted_key]:
-            # Split stderr by newlines to handle multiple lines of errors
-            # Example: "Error occurred\nDebugger attached\nAnother error" -> ["Error occurred", "Debugger attached", "Another error"]
-            stderr_lines = adjusted_outputs[adjusted_key]['stderr'].split('\n')
-            
-            # Filter out lines that contain the specified words, case-insensitive
-            # Example: ["Error occurred", "Debugger attached", "Another error"] -> ["Error occurred", "Another error"]
-            filtered_stderr_lines = [
-                line for line in stderr_lines 
-                if not any(word in line.lower() for word in ['debugger', 'debugging', 'frozen modules'])
-            ]
-            
-            # Join the filtered lines back into a single string
-            # Example: ["Error occurred", "Another error"] -> "Error occurred\nAnother error"
-            adjusted_outputs[adjusted_key]['stderr'] = '\n'.join(filtered_stderr_lines)
-    
-    return adjusted_outputs
+# Matches stderr lines that are debugger or frozen module noise
+_STDERR_NOISE_RE = re.compile(r"debugger|debugging|frozen modules", re.IGNORECASE)
 
-def assert_outputs(actual_outputs: Dict[str, Dict[str, str]], expected_outputs: Dict[str, Dict[str, str]], is_test: bool = False) -> bool:
+def assert_execute_result(outputs: Dict[str, Dict[str, Dict[str, str]]], expected_script_outputs: Mapping[str, Dict[str, str]], 
+                          expected_test_outputs: Mapping[str, Dict[str, str]]) -> None:
     """
-    Asserts that the actual outputs match the expected outputs. Used in the test_execute() function
-    to validate the results of test cases for both test files and normal files.
-
-    For test files:
-    - Checks if the output contains specific substrings indicating that tests have passed.
-    - Also compares the standard output and standard error with the expected values.
+    Asserts that the outputs returned by execute() match the expected script and test outputs.
 
-    For normal files:
-    - Compares the standard output and standard error with the expected values.
+    Purpose: The directory paths of the keys are masked to their last two parts and the stderr noise is
+    filtered while comparing, so the outputs are walked once and the first mismatch raises an AssertionError.
+    The masked keys must equal the expected keys, so an extra script or test output fails as well.
 
-    This ensures that the execute() function returns the correct results for both types of files.
+    Used in: The test_execute function.
 
     Args:
-        actual_outputs (dict): Dictionary of actual outputs to check.
-        expected_outputs (dict): Dictionary of expected outputs to compare against.
-        is_test (bool): Flag to indicate if the outputs are from tests or scripts. Defaults to False.
+        outputs (dict): The dictionary returned by execute(), with "script_outputs" and "test_outputs".
+        expected_script_outputs (Mapping): Expected script outputs keyed by "directory/file name".
+        expected_test_outputs (Mapping): Expected test outputs keyed by "directory/file name".
 
-    Returns:
-        bool: True if all assertions pass, False if any assertion fails.
+    Raises:
+        AssertionError: If an expected output is missing, an unexpected output is present or an output doesn't match.
+
+    Example Usage:
+        >>> outputs = {
+        ...     "script_outputs": {"/tmp/pytest-198/dir1/file1.py": {"stdout": "Result of add: 5\n", "stderr": ""}},
+        ...     "test_outputs": {}
+        ... }
+        >>> assert_execute_result(outputs, {"dir1/file1.py": {"stdout": "Result of add: 5\n", "stderr": ""}}, {})
+        # Passes since the masked key "dir1/file1.py" and its outputs match
     """
-    try:
-        for expected_key, expected_output in expected_outputs.items():
-            # Example: "dir1/test_file1.py" on Windows -> "dir1\\test_file1.py" -> normalized_key
-            # Input Example: "C:\\some\\path\\dir1\\test_file1.py" -> Output Example: "dir1\\test_file1.py"
-            normalized_key = os.path.join(*os.path.normpath(expected_key).split(os.sep)[-2:])
-
-            # Find the corresponding key in the actual outputs, handling potential path discrepancies
-            # Example: actual_outputs = {"C:\\some\\other\\path\\dir1\\test_file1.py": {...}} -> "dir1\\test_file1.py" == normalized_key -> actual_key
-            actual_key = None
-            for key in actual_outputs:
-                # Normalize and extract the last two components (directory and file name)
-                # Input Example: "C:\\some\\other\\path\\dir2\\test_file2.py" -> Output Example: "dir2\\test_file2.py"
-                normalized_actual_key = os.path.join(*os.path.normpath(key).split(os.sep)[-2:])
-                
-                # Check if this normalized key matches the expected one
-                if normalized_actual_key == normalized_key:
-                    actual_key = key
-                    break
-
-            # Assert that a match was found
-            # Example Assertion: If normalized_key is "dir1\\test_file1.py" and actual_key is None, the assertion fails.
-            assert actual_key is not None, f"{normalized_key} not found in outputs"
-
-            # Retrieve the actual output for comparison
-            # Example: actual_outputs = {"dir1/test_file1.py": {"stdout": "output", "stderr": "error"}} -> actual_output = {"stdout": "output", "stderr": "error"}
-            actual_output = actual_outputs[actual_key]
-
-            if is_test and not (expected_output["stdout"] == "" and expected_output["stderr"] == ""):
-                # Define the required substrings to check in stdout for a valid test output
-                required_substrings = [
-                    "============================= test session starts =============================",
-                    f"{Path(expected_key).name}",  # Ensure the filename is in the output
-                    "[100%]",
-                    "1 passed in"
-                ]
-                # Check if all required substrings are present in stdout
-                # Example: actual_output['stdout'] = "test session starts\nfile.py\n[100%]\n1 passed in" -> substring in actual_output['stdout']
-                for substring in required_substrings:
-                    # Example: "============================= test session starts =============================" -> True (if present)
-                    assert substring in actual_output['stdout'], f"Output mismatch for {expected_key}: '{substring}' not found in stdout"
-                
-                # Special case handling for tests with "More output" in stdout
-                # Example: expected_output['stdout'] = "More output\nDetails", actual_output['stdout'] = "More output\nDetails" -> "More output" in actual_output['stdout']
-                if "More output" in expected_output['stdout']:
-                    # Example: "More output" -> True (if present)
-                    assert "More output" in actual_output['stdout'], f"Output mismatch for {expected_key}: 'More output' not found in stdout"
+    for actual_outputs, expected_outputs, is_test in ((outputs["script_outputs"], expected_script_outputs, False), 
+                                                      (outputs["test_outputs"], expected_test_outputs, True)):
+        # Mask the keys of the actual outputs to "directory/file name"
+        # Example: "C:\\some\\path\\dir1\\test_file1.py" -> "dir1/test_file1.py"
+        masked_outputs = {_DIR_MASK_RE.sub(r"\1", key).replace("\\", "/"): value for key, value in actual_outputs.items()}
+        masked_expected = {_DIR_MASK_RE.sub(r"\1", key).replace("\\", "/"): key for key in expected_outputs}
+
+        # Compare the key sets both ways, so missing and extra outputs are reported together
+        # Example: {"dir1/file1.py", "dir2/file3.py"} vs {"dir1/file1.py"} -> extra: ['dir2/file3.py']
+        missing = sorted(masked_expected.keys() - masked_outputs.keys())
+        extra = sorted(masked_outputs.keys() - masked_expected.keys())
+        assert not missing and not extra, f"Output keys mismatch, missing: {missing}, extra: {extra}"
+
+        for masked_key, expected_key in masked_expected.items():
+            expected_output = expected_outputs[expected_key]
+            actual_output = masked_outputs[masked_key]
+
+            # Remove the debugger and frozen modules lines from stderr
+            # Example: "Debugger warning\nSome other error" -> "Some other error"
+            stderr = "\n".join(line for line in actual_output["stderr"].split("\n") if not _STDERR_NOISE_RE.search(line))
+
+            if is_test and (expected_output["stdout"] or expected_output["stderr"]):
+                # Check that the pytest run of the test file passed
+                for substring in ("============================= test session starts =============================",
+                                  Path(expected_key).name, "[100%]", "1 passed in"):
+                    assert substring in actual_output["stdout"], f"Output mismatch for {expected_key}: '{substring}' not found in stdout"
             else:
-                # Assert that the stdout of the actual output matches the expected stdout
-                # Example: actual_output['stdout'] = "output", expected_output['stdout'] = "output" -> actual_output['stdout'] == expected_output['stdout']
-                assert actual_output['stdout'] == expected_output['stdout'], f"Output mismatch for {expected_key}: {actual_output['stdout']} != {expected_output['stdout']}"
-            
+                # Compare the stdout of scripts (and unrecorded tests) exactly
+                assert actual_output["stdout"] == expected_output["stdout"], f"Output mismatch for {expected_key}: {actual_output['stdout']} != {expected_output['stdout']}"
+
             # Assert that stderr matches
-            # Example: actual_output['stderr'] = "error", expected_output['stderr'] = "error" -> actual_output['stderr'] == expected_output['stderr']
-            assert actual_output['stderr'] == expected_output['stderr'], f"Error output mismatch for {expected_key}: {actual_output['stderr']} != {expected_output['stderr']}"
-        
-        return True
-    except AssertionError as e:
-        # Example: AssertionError: "Error output mismatch for dir1/test_file1.py: error !="
-        print(e)
-        return False
+            assert stderr == expected_output["stderr"], f"Error output mismatch for {expected_key}: {stderr} != {expected_output['stderr']}"
 
 @pytest.mark.parametrize("iterations", [10, 20, 30])
-def test_generate_nested_lists(iterations):
+def test_generate_nested_lists(iterations, rng):
     """
     Tests the generate_nested_lists function to ensure it returns either an empty list
     or a nested empty list structure.
 
     Args:
         iterations: The number of times to run the test to cover random outputs.
+        rng: Seeded random number generator fixture, shared across the iterations so each one gets a new structure.
     """
     for _ in range(iterations):
-        nested_list = generate_nested_lists()  # Generate a nested list
+        nested_list = generate_nested_lists(rng)  # Generate a nested list
         assert is_nested_empty_list(nested_list)  # Assert that the generated list is either empty or a nested empty list
 
 
+# Python sources for test_extract_classes_and_functions, written without indentation so no dedent is needed
+# Source for test case 1: a class with methods and a standalone function
+_SRC_CLASS_AND_FUNCTION = """
+class TestClass:
+    def method_one(self):
+        pass
+
+    def method_two(self):
+        pass
+
+def standalone_function():
+    pass
+"""
+
+# Source for test case 2: a class with methods and no standalone functions
+_SRC_CLASS_ONLY = """
+class SampleClass:
+    def __init__(self):
+        pass
+
+    def sample_method(self):
+        pass
+"""
+
+# Source for test case 3: only a standalone function
+_SRC_ONE_FUNCTION = """
+def helper_function():
+    pass
+"""
+
+# Source for test case 4: only standalone functions
+_SRC_TWO_FUNCTIONS = """
+def function_one():
+    pass
+
+def function_two():
+    pass
+"""
+
+# Source for test case 6: a method and a standalone function with the same name, and a nested function
+_SRC_NESTED_AND_SHADOWED = """
+class Runner:
+    def run(self):
+        pass
+
+def run():
+    def inner():
+        pass
+"""
+
 @pytest.mark.parametrize(
     "file_content, expected_result",
     [
         # Test case 1: File containing a class with methods and a standalone function
         (
-            textwrap.dedent("""
-            class TestClass:
-                def method_one(self):
-                    pass
-
-                def method_two(self):
-                    pass
-
-            def standalone_function():
-                pass
-            """),
+            _SRC_CLASS_AND_FUNCTION,
             {
                 'TestClass': ['method_one', 'method_two'],
                 'standalone_function': None
@@ -336,37 +352,21 @@ def test_generate_nested_lists(iterations):
         ),
         # Test case 2: File containing a class with methods and no standalone functions
         (
-            textwrap.dedent("""
-            class SampleClass:
-                def __init__(self):
-                    pass
-
-                def sample_method(self):
-                    pass
-            """),
+            _SRC_CLASS_ONLY,
             {
                 'SampleClass': ['__init__', 'sample_method']
             }
         ),
         # Test case 3: File containing only a standalone function
         (
-            textwrap.dedent("""
-            def helper_function():
-                pass
-            """),
+            _SRC_ONE_FUNCTION,
             {
                 'helper_function': None
             }
         ),
         # Test case 4: File containing only standalone functions
         (
-            textwrap.dedent("""
-            def function_one():
-                pass
-
-            def function_two():
-                pass
-            """),
+            _SRC_TWO_FUNCTIONS,
             {
                 'function_one': None,
                 'function_two': None
@@ -377,367 +377,218 @@ def test_generate_nested_lists(iterations):
             "",
             {}
         ),
+        # Test case 6: Only top-level definitions are reported, nested functions are not and 
+        # a method named like a standalone function doesn't hide it
+        (
+            _SRC_NESTED_AND_SHADOWED,
+            {
+                'Runner': ['run'],
+                'run': None
+            }
+        ),
     ],
     ids=[
         "1",  # Test Case 1
         "2",  # Test Case 2
         "3",  # Test Case 3
         "4",  # Test Case 4
-        "5"   # Test Case 5
+        "5",  # Test Case 5
+        "6"   # Test Case 6
     ]
 )
-def test_extract_classes_and_functions(file_content: str, expected_result: Dict[str, Union[List[str], None]]) -> None:
+def test_extract_classes_and_functions(tmp_path: Path, file_content: str, expected_result: Dict[str, Union[List[str], None]]) -> None:
     """
     Parameterized test for the extract_classes_and_functions function.
 
     Args:
+        tmp_path (Path): Pytest's per-test temporary directory, removed by pytest's retention policy.
         file_content (str): The content of the Python file to be tested.
         expected_result (Dict[str, Union[List[str], None]]): The expected result after extracting classes and functions.
 
     Example Usage:
-        >>> test_extract_classes_and_functions(file_content, expected_result)
+        >>> test_extract_classes_and_functions(tmp_path, file_content, expected_result)
         # This will run the test with the provided file content and expected result.
     """
-    # Create a temporary file to hold the test content
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".py") as temp_file:
-        temp_file.write(file_content.encode('utf-8'))
-        temp_file_path = temp_file.name
-
-    try:
-        # Call the function with the path to the temporary file
-        result = extract_classes_and_functions(temp_file_path)
-        # Assert that the result matches the expected result
-        assert result == expected_result, f"Expected {expected_result}, but got {result}"
-    finally:
-        # Clean up the temporary file
-        os.remove(temp_file_path)
-
-@pytest.mark.parametrize("outputs, expected", [
-    # Basic test output with directory paths adjusted
-    (
-        {
-            "dir1/test_file1.py": {"stdout": "Test output 1", "stderr": ""},
-            "dir2/test_file3.py": {"stdout": "Test output 2", "stderr": ""}
-        },
-        {
-            'dir1/test_file1.py': {'stdout': 'Test output 1', 'stderr': ''},
-            'dir2/test_file3.py': {'stdout': 'Test output 2', 'stderr': ''}
-        }
-    ),
-    # Script output with adjusted directory paths
-    (
-        {
-            "/tmp/pytest-of-user/pytest-198/test_execute_None_files_by_dir0/dir1/file1.py": {"stdout": "Script output 1", "stderr": ""},
-            "/tmp/pytest-of-user/pytest-198/test_execute_None_files_by_dir0/dir2/file3.py": {"stdout": "Script output 2", "stderr": ""}
-        },
-        {
-            'dir1/file1.py': {'stdout': 'Script output 1', 'stderr': ''},
-            'dir2/file3.py': {'stdout': 'Script output 2', 'stderr': ''}
-        }
-    ),
-    # Test output with stderr containing lines to be filtered
-    (
-        {
-            "dir1/test_file1.py": {"stdout": "Test output 1", "stderr": "Debugger warning\nSome other error\nDebugging issue"},
-            "dir2/test_file3.py": {"stdout": "Test output 2", "stderr": "Frozen modules warning\nAnother error"}
-        },
-        {
-            'dir1/test_file1.py': {'stdout': 'Test output 1', 'stderr': 'Some other error'},
-            'dir2/test_file3.py': {'stdout': 'Test output 2', 'stderr': 'Another error'}
-        }
-    ),
-    # Mixed output
-    (
-        {
-            "dir1/test_file1.py": {"stdout": "Mixed output 1", "stderr": ""},
-            "dir2/file3.py": {"stdout": "Mixed output 2", "stderr": ""}
-        },
-        {
-            'dir1/test_file1.py': {'stdout': 'Mixed output 1', 'stderr': ''},
-            'dir2/file3.py': {'stdout': 'Mixed output 2', 'stderr': ''}
-        }
-    ),
-    # Test case with Windows-style paths and double backslashes
-    (
-        {
-            "C:\\dir1\\test_file1.py": {"stdout": "Win output 1", "stderr": ""},
-            "C:\\dir2\\test_file3.py": {"stdout": "Win output 2", "stderr": ""}
-        },
-        {
-            'dir1/test_file1.py': {'stdout': 'Win output 1', 'stderr': ''},
-            'dir2/test_file3.py': {'stdout': 'Win output 2', 'stderr': ''}
-        }
-    ),
-    # Mixed case with Windows-style paths and stderr filtering
-    (
-        {
-            "C:\\dir1\\test_file1.py": {"stdout": "Mixed Win output 1", "stderr": "Debugger warning\nSome other error"},
-            "C:\\dir2\\test_file3.py": {"stdout": "Mixed Win output 2", "stderr": "Debugging issue\nAnother error"}
-        },
-        {
-            'dir1/test_file1.py': {'stdout': 'Mixed Win output 1', 'stderr': 'Some other error'},
-            'dir2/test_file3.py': {'stdout': 'Mixed Win output 2', 'stderr': 'Another error'}
-        }
-    ),
-    # Test case with very long paths
-    (
-        {
-            "/a/very/long/path/to/the/directory/structure/dir1/test_file1.py": {"stdout": "Long path output 1", "stderr": ""},
-            "/a/very/long/path/to/the/directory/structure/dir2/test_file3.py": {"stdout": "Long path output 2", "stderr": ""}
-        },
-        {
-            'dir1/test_file1.py': {'stdout': 'Long path output 1', 'stderr': ''},
-            'dir2/test_file3.py': {'stdout': 'Long path output 2', 'stderr': ''}
-        }
-    ),
-    # Test case with very long Windows-style paths
-    (
-        {
-            "C:\\a\\very\\long\\path\\to\\the\\directory\\structure\\dir1\\test_file1.py": {"stdout": "Long Win path output 1", "stderr": ""},
-            "C:\\a\\very\\long\\path\\to\\the\\directory\\structure\\dir2\\test_file3.py": {"stdout": "Long Win path output 2", "stderr": ""}
-        },
-        {
-            'dir1/test_file1.py': {'stdout': 'Long Win path output 1', 'stderr': ''},
-            'dir2/test_file3.py': {'stdout': 'Long Win path output 2', 'stderr': ''}
-        }
-    )
-])
-def test_adjust_outputs(outputs, expected):
+    # Write the test content to a file in the temporary directory
+    file_path = tmp_path / "mod.py"
+    file_path.write_text(file_content, encoding="utf-8")
+
+    # Call the function with the path to the file and assert that the result matches the expected result
+    result = extract_classes_and_functions(str(file_path))
+    assert result == expected_result, f"Expected {expected_result}, but got {result}"
+
+def test_extract_classes_and_functions_cache(tmp_path: Path) -> None:
     """
-    Test the adjust_outputs function with various cases, handling different
-    file path formats, and filtering stderr lines.
+    Test that extract_classes_and_functions serves an unchanged file from the cache, returns a copy of the cached
+    entry and parses a file again after it is edited, as aider does in test_aider_runner.
 
     Args:
-        outputs (dict): The dictionary of outputs to adjust.
-        expected (dict): The expected adjusted outputs.
+        tmp_path (Path): Pytest's per-test temporary directory.
     """
-    result = adjust_outputs(outputs)
-    assert result == expected
-
-@pytest.mark.parametrize("actual_outputs, expected_outputs, is_test, should_fail", [
-    # Test Case 1: Basic test case where actual and expected outputs match for a single test file
-    (
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in", "stderr": ""}
-        }, # actual_outputs
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in", "stderr": ""}
-        }, # expected_outputs
-        True, # is_test
-        False # should_fail
-    ),
-    # Test Case 2: Test case with stderr output for a test file
-    (
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in", "stderr": "Some error"}
-        }, # actual_outputs
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in", "stderr": "Some error"}
-        }, # expected_outputs
-        True, # is_test
-        False # should_fail
-    ),
-    # Test Case 3: Test case with Windows-style paths for a test file
-    (
-        {
-            "C:\\dir1\\test_file1.py": {"stdout": "============================= test session starts =============================\ndir1\\test_file1.py\n[100%]\n1 passed in", "stderr": ""}
-        }, # actual_outputs
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in", "stderr": ""}
-        }, # expected_outputs
-        True, # is_test
-        False # should_fail
-    ),
-    # Test Case 4: Test case with additional required substrings in stdout for a test file
-    (
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in\nMore output", "stderr": ""}
-        }, # actual_outputs
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in\nMore output", "stderr": ""}
-        }, # expected_outputs
-        True, # is_test
-        False # should_fail
-    ),
-    # Test Case 5: Normal script case where actual and expected outputs match (not a test case)
-    (
-        {
-            "dir1/file1.py": {"stdout": "Result of add: 5\n", "stderr": ""},
-            "dir2/file3.py": {"stdout": "Result of subtract: 2\n", "stderr": ""}
-        }, # actual_outputs
-        {
-            "dir1/file1.py": {"stdout": "Result of add: 5\n", "stderr": ""},
-            "dir2/file3.py": {"stdout": "Result of subtract: 2\n", "stderr": ""}
-        }, # expected_outputs
-        False, # is_test
-        False # should_fail
-    ),
-    # Test Case 6: Normal script case with mixed outputs
-    (
-        {
-            "dir1/file1.py": {"stdout": "Result of add: 5\n", "stderr": "Warning: something"},
-            "dir2/file3.py": {"stdout": "Result of subtract: 2\n", "stderr": ""}
-        }, # actual_outputs
-        {
-            "dir1/file1.py": {"stdout": "Result of add: 5\n", "stderr": "Warning: something"},
-            "dir2/file3.py": {"stdout": "Result of subtract: 2\n", "stderr": ""}
-        }, # expected_outputs
-        False, # is_test
-        False # should_fail
-    ),
-    # Test Case 7: Another normal script case with no output
-    (
-        {
-            "dir1/empty_script.py": {"stdout": "", "stderr": ""}
-        }, # actual_outputs
-        {
-            "dir1/empty_script.py": {"stdout": "", "stderr": ""}
-        }, # expected_outputs
-        False, # is_test
-        False # should_fail
-    ),
-    # Test Case 8: Failing test case: Output mismatch in test file
-    (
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in", "stderr": ""},
-            "dir2/script_file.py": {"stdout": "Script output", "stderr": ""}
-        }, # actual_outputs
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 failed in", "stderr": ""},
-            "dir2/script_file.py": {"stdout": "Script output", "stderr": ""}
-        }, # expected_outputs
-        True, # is_test
-        True # should_fail
-    ),
-    # Test Case 9: Failing test case: Missing required substring in test file stdout
-    (
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[90%]\n1 passed in", "stderr": ""},
-            "dir2/script_file.py": {"stdout": "Script output", "stderr": ""}
-        }, # actual_outputs
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in", "stderr": ""},
-            "dir2/script_file.py": {"stdout": "Script output", "stderr": ""}
-        }, # expected_outputs
-        True, # is_test
-        True # should_fail
-    ),
-    # Test Case 10: Failing test case: Error output mismatch in test file
-    (
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in", "stderr": "Some error"},
-            "dir2/script_file.py": {"stdout": "Script output", "stderr": ""}
-        }, # actual_outputs
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in", "stderr": ""},
-            "dir2/script_file.py": {"stdout": "Script output", "stderr": ""}
-        }, # expected_outputs
-        True, # is_test
-        True # should_fail
-    ),
-    # Test Case 11: Failing test case: Script file output mismatch
-    (
-        {
-            "dir1/file1.py": {"stdout": "Result of add: 4\n", "stderr": ""},
-            "dir2/file3.py": {"stdout": "Result of subtract: 2\n", "stderr": ""}
-        }, # actual_outputs
-        {
-            "dir1/file1.py": {"stdout": "Result of add: 5\n", "stderr": ""},
-            "dir2/file3.py": {"stdout": "Result of subtract: 2\n", "stderr": ""}
-        }, # expected_outputs
-        False, # is_test
-        True # should_fail
-    ),
-    # Test Case 12: Failing test case: Error output mismatch in script file
-    (
-        {
-            "dir1/file1.py": {"stdout": "Result of add: 5\n", "stderr": "Warning: something"},
-            "dir2/file3.py": {"stdout": "Result of subtract: 2\n", "stderr": "Error occurred"}
-        }, # actual_outputs
-        {
-            "dir1/file1.py": {"stdout": "Result of add: 5\n", "stderr": "Warning: something"},
-            "dir2/file3.py": {"stdout": "Result of subtract: 2\n", "stderr": ""}
-        }, # expected_outputs
-        False, # is_test
-        True # should_fail
-    ),
-    # Test Case 13: No errors, matching actual and expected outputs
-    (
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in 0.02s ==============================", "stderr": ""},
-            "dir1/test_file2.py": {"stdout": "", "stderr": ""},
-            "dir2/test_file3.py": {"stdout": "", "stderr": ""}
-        }, # actual_outputs
-        {
-            "dir1/test_file1.py": {"stdout": "============================= test session starts =============================\ndir1/test_file1.py\n[100%]\n1 passed in 0.02s ==============================", "stderr": ""},
-            "dir1/test_file2.py": {"stdout": "", "stderr": ""},
-            "dir2/test_file3.py": {"stdout": "", "stderr": ""}
-        }, # expected_outputs
-        True, # is_test
-        False # should_fail
-    )
-],
-ids=[
-    "1",  # Test Case 1
-    "2",  # Test Case 2
-    "3",  # Test Case 3
-    "4",  # Test Case 4
-    "5",  # Test Case 5
-    "6",  # Test Case 6
-    "7",  # Test Case 7
-    "8",  # Test Case 8
-    "9",  # Test Case 9
-    "10", # Test Case 10
-    "11", # Test Case 11
-    "12", # Test Case 12
-    "13"  # Test Case 13 
-])
-def test_assert_outputs(actual_outputs, expected_outputs, is_test, should_fail):
+    file_path = tmp_path / "mod.py"
+    file_path.write_text("def first():\n    pass\n", encoding="utf-8")
+    assert extract_classes_and_functions(str(file_path)) == {"first": None}
+
+    # Unchanged file: served from the cache, no new entry is added
+    cache_size = len(_EXTRACT_CACHE)
+    result = extract_classes_and_functions(str(file_path))
+    assert result == {"first": None}
+    assert len(_EXTRACT_CACHE) == cache_size
+
+    # Mutating the returned dictionary doesn't change the cached entry
+    result["added"] = None
+    assert extract_classes_and_functions(str(file_path)) == {"first": None}
+
+    # Edited file: new contents and digest, so it is parsed again
+    file_path.write_text("class Second:\n    def method(self):\n        pass\n", encoding="utf-8")
+    assert extract_classes_and_functions(str(file_path)) == {"Second": ["method"]}
+
+    # Edit that keeps the size and the mtime: the digest of the contents changed, so it is still parsed again
+    stat_result = file_path.stat()
+    file_path.write_text("class Second:\n    def mEthod(self):\n        pass\n", encoding="utf-8")
+    os.utime(file_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+    assert extract_classes_and_functions(str(file_path)) == {"Second": ["mEthod"]}
+
+@pytest.mark.parametrize("file_content, expect_syntax_error", [
+    # Invalid Python with a def: parsed, so the SyntaxError is raised
+    ("def broken(:\n    pass\n", True),
+    # Invalid Python without def or class: skipped by the keyword check, so no SyntaxError and nothing is extracted
+    ("x = (\n", False),
+], ids=["with_def", "without_def_or_class"])
+def test_extract_classes_and_functions_syntax_error(tmp_path: Path, file_content: str, expect_syntax_error: bool) -> None:
     """
-    Test the assert_outputs function with various cases, including matching actual and expected outputs,
-    handling different file path formats, and verifying specific substrings in stdout.
+    Test which invalid files raise a SyntaxError in extract_classes_and_functions, pinning that a file
+    without the def or class keywords is never parsed.
 
     Args:
-        actual_outputs (dict): Dictionary of actual outputs to check.
-        expected_outputs (dict): Dictionary of expected outputs to compare against.
-        is_test (bool): Flag to indicate if the outputs are from tests or scripts.
-        should_fail (bool): Flag to indicate if the test case is expected to fail.
+        tmp_path (Path): Pytest's per-test temporary directory.
+        file_content (str): The invalid Python source to write to the file.
+        expect_syntax_error (bool): Whether a SyntaxError is expected.
     """
-    if should_fail:
-        # If should_fail is True, assert that assert_outputs returns False
-        assert not assert_outputs(actual_outputs, expected_outputs, is_test), "Expected assert_outputs to return False"
-        # Example: actual_outputs = ["output1"], expected_outputs = ["output2"], is_test = True or False -> assert_outputs(...) = False
+    file_path = tmp_path / "broken.py"
+    file_path.write_text(file_content, encoding="utf-8")
+
+    if expect_syntax_error:
+        with pytest.raises(SyntaxError):
+            extract_classes_and_functions(str(file_path))
     else:
-        # If should_fail is False, assert that assert_outputs returns True
-        assert assert_outputs(actual_outputs, expected_outputs, is_test), "Expected assert_outputs to return True"
-        # Example: actual_outputs = ["output1"], expected_outputs = ["output1"], is_test = True or False -> assert_outputs(...) = True
+        assert extract_classes_and_functions(str(file_path)) == {}
+
+@pytest.mark.parametrize("outputs, expected_script_outputs, expected_test_outputs", [
+    # Test case 1: POSIX keys are masked to "directory/file name" and matched
+    ({"script_outputs": {"/tmp/pytest-198/dir1/file1.py": {"stdout": "Result of add: 5\n", "stderr": ""}}, "test_outputs": {}},
+     {"dir1/file1.py": {"stdout": "Result of add: 5\n", "stderr": ""}}, {}),
+
+    # Test case 2: Windows keys are masked the same way and debugger lines are dropped from stderr
+    ({"script_outputs": {"C:\\Users\\test\\dir2\\file3.py": {"stdout": "", "stderr": "Debugger warning: frozen modules\nZeroDivisionError"}}, 
+      "test_outputs": {}},
+     {"dir2/file3.py": {"stdout": "", "stderr": "ZeroDivisionError"}}, {}),
+
+    # Test case 3: Recorded test outputs only need to contain the pytest summary substrings
+    ({"script_outputs": {}, 
+      "test_outputs": {"/tmp/dir1/test_file1.py": {"stdout": "============================= test session starts =============================\n"
+                                                            "test_file1.py .  [100%]\n1 passed in 0.01s\n", "stderr": ""}}},
+     {}, {"dir1/test_file1.py": {"stdout": "1 passed", "stderr": ""}}),
+
+    # Test case 4: Unrecorded test outputs are compared exactly
+    ({"script_outputs": {}, "test_outputs": {"/tmp/dir1/test_file1.py": {"stdout": "", "stderr": ""}}},
+     {}, {"dir1/test_file1.py": {"stdout": "", "stderr": ""}}),
+
+    # Test case 5: Mismatched stdout fails
+    pytest.param({"script_outputs": {"/tmp/dir1/file1.py": {"stdout": "Result of add: 6\n", "stderr": ""}}, "test_outputs": {}},
+                 {"dir1/file1.py": {"stdout": "Result of add: 5\n", "stderr": ""}}, {},
+                 marks=pytest.mark.xfail(raises=AssertionError, reason="mismatch", strict=True)),
+
+    # Test case 6: Missing key fails
+    pytest.param({"script_outputs": {"/tmp/dir1/file1.py": {"stdout": "", "stderr": ""}}, "test_outputs": {}},
+                 {"dir1/file2.py": {"stdout": "", "stderr": ""}}, {},
+                 marks=pytest.mark.xfail(raises=AssertionError, reason="missing key", strict=True)),
+
+    # Test case 7: Extra test output that is not expected fails
+    pytest.param({"script_outputs": {"/tmp/dir1/file1.py": {"stdout": "", "stderr": ""}}, 
+                  "test_outputs": {"/tmp/dir1/test_file1.py": {"stdout": "", "stderr": ""}}},
+                 {"dir1/file1.py": {"stdout": "", "stderr": ""}}, {},
+                 marks=pytest.mark.xfail(raises=AssertionError, reason="extra key", strict=True)),
+], ids=["1", "2", "3", "4", "5", "6", "7"])
+def test_assert_execute_result(outputs, expected_script_outputs, expected_test_outputs):
+    """
+    Test the assert_execute_result function with the outputs returned by execute(), including masking the
+    directory paths of the keys, filtering the stderr noise and checking the pytest output substrings.
+
+    Cases where the outputs are expected to mismatch are marked with a strict xfail in the
+    parametrize list, so the test body only has a single code path.
+
+    Args:
+        outputs (dict): The dictionary returned by execute(), with "script_outputs" and "test_outputs".
+        expected_script_outputs (dict): Expected script outputs keyed by "directory/file name".
+        expected_test_outputs (dict): Expected test outputs keyed by "directory/file name".
+    """
+    # assert_execute_result raises an AssertionError on the first mismatch; mismatching cases are reported as xfail by pytest
+    assert_execute_result(outputs, expected_script_outputs, expected_test_outputs)
+
+def make_empty_files(dir_path: Path, file_names: List[str]) -> None:
+    """
+    Creates an empty file for each name in a directory.
+
+    Purpose: Path.touch() opens the file, updates its timestamps and closes it. Opening with O_CREAT
+    and closing right away is enough for the new empty files of the test_aider_runner cases.
+
+    Args:
+        dir_path (Path): The directory to create the files in.
+        file_names (List[str]): The names of the files to create.
+
+    Example Usage:
+        >>> make_empty_files(Path("/tmp/mock_dir/directory"), ["file1.py", "file2.py"])
+        # Creates /tmp/mock_dir/directory/file1.py and /tmp/mock_dir/directory/file2.py
+    """
+    for file_name in file_names:
+        os.close(os.open(os.path.join(dir_path, file_name), os.O_CREAT | os.O_WRONLY, 0o644))
+
+@pytest.fixture(scope="session")
+def aider_model() -> "Model":
+    """
+    Session-scoped fixture providing the model used by test_aider_runner.
+
+    Purpose: Model construction looks up the model's settings and metadata, so it is done once per
+    session instead of once per parameterized case.
+
+    Returns:
+        Model: The OpenRouter DeepSeek Coder model.
+    """
+    from aider.models import Model
+    return Model("openrouter/deepseek/deepseek-coder")  # Use the predefined model identifier
 
 @pytest.fixture
-def mock_environment(tmp_path) -> Generator[Dict[str, Any], None, None]:
+def mock_environment(tmp_path_factory: pytest.TempPathFactory, request: pytest.FixtureRequest) -> Dict[str, Any]:
     """
     Fixture for creating a temporary directory for file operations and providing a model.
 
+    The directory is named after the test case id, so cases that use the same directory name (e.g. "directory") 
+    don't see each other's files. tmp_path_factory numbers the directories, so a case that runs again in the 
+    same session (e.g. a rerun, or the same id in another parametrize) gets a new empty directory.
+
+    The aider_model fixture is only requested by the cases that run the coder (no expected exception), the
+    exception cases raise before the model is used, so they get None and don't import aider.
+
     Returns:
-        dict: Dictionary containing a model object and a temp directory.
+        dict: Dictionary containing the shared model object (or None) and a temp directory.
     """
-    temp_dir = tmp_path / "mock_dir"
-    temp_dir.mkdir()
+    # Example: /tmp/pytest-of-user/pytest-198/directory-files_by_directory0-instructions0-None-expected_functions_classes00
+    temp_dir = tmp_path_factory.mktemp(request.node.callspec.id)
+
+    # Example: expected_exception = ValueError -> model = None, expected_exception = None -> the shared session model
+    run_coder = request.node.callspec.params["expected_exception"] is None
     
-    # Yield control to the test function, providing the model and temp directory
-    yield {
-        "model": Model("openrouter/deepseek/deepseek-coder"),  # Use the predefined model identifier
+    return {
+        "model": request.getfixturevalue("aider_model") if run_coder else None,  # Shared session model
         "temp_dir": temp_dir  # Temporary directory for creating files
     }
 
-    # Teardown: Cleanup of the temp_dir
-    if temp_dir.exists():
-        shutil.rmtree(temp_dir)  # Remove the parent of the parent directory
-
 @pytest.mark.parametrize(
     "directory, files_by_directory, instructions, expected_exception, expected_functions_classes",
     [
         # Valid inputs: directory and files exist, instructions provided to modify the files
-        (
+        pytest.param(
             "directory", 
             ["file1.py", "file2.py"], 
             ["file1.py: create function print_hello_world", "file2.py: create class SumCalculator with method calculate_sum"], 
@@ -749,7 +600,8 @@ def mock_environment(tmp_path) -> Generator[Dict[str, Any], None, None]:
                 "file2.py": {
                     "SumCalculator": ["calculate_sum"]
                 }
-            }  # Expected content in the files
+            },  # Expected content in the files
+            marks=pytest.mark.slow  # Calls the remote model
         ),
         # Empty file list: directory exists, but no files are listed to be modified. Should raise an error.
         (
@@ -760,7 +612,7 @@ def mock_environment(tmp_path) -> Generator[Dict[str, Any], None, None]:
             {}  # No files to check for content
         ),
         # Single file: directory and one file exist, instruction provided to modify the single file
-        (
+        pytest.param(
             "directory_with_one_file", 
             ["single_file.py"], 
             ["single_file.py: create function print_numbers"], 
@@ -769,7 +621,8 @@ def mock_environment(tmp_path) -> Generator[Dict[str, Any], None, None]:
                 "single_file.py": {
                     "print_numbers": None
                 }
-            }  # Expected content in the single file
+            },  # Expected content in the single file
+            marks=pytest.mark.slow  # Calls the remote model
         ),
         # Invalid directory: directory does not exist, should raise an error
         (
@@ -803,7 +656,8 @@ def test_aider_runner(
     files_by_directory: List[str], 
     instructions: List[str], 
     expected_exception: Any,
-    expected_functions_classes: Dict[str, Dict[str, Union[List[str], None]]]
+    expected_functions_classes: Dict[str, Dict[str, Union[List[str], None]]],
+    api_rate_limiter: Any
 ) -> None:
     """
     Parameterized test for the aider_runner function.
@@ -815,6 +669,7 @@ def test_aider_runner(
         instructions (List[str]): List of instructions to run on the files.
         expected_exception (Exception or None): Expected exception to be raised, if any.
         expected_functions_classes (Dict[str, Dict[str, Union[List[str], None]]]): Expected functions or classes to be present in the files after modification.
+        api_rate_limiter (Fixture): Shared rate limiter used to space out calls to the remote model.
     """
     model = mock_environment["model"]  # Get the mock model from the fixture
     temp_dir = mock_environment["temp_dir"]  # Get the temporary directory
@@ -822,8 +677,7 @@ def test_aider_runner(
     # Create mock files in the temporary directory
     dir_path = Path(temp_dir) / directory
     dir_path.mkdir(parents=True, exist_ok=True)  # Create the directory path
-    for file_name in files_by_directory:
-        (dir_path / file_name).touch()  # Create empty files for each file name in the list
+    make_empty_files(dir_path, files_by_directory)  # Create empty files for each file name in the list
 
     if expected_exception:
         # Handle special cases for invalid directory and non-existent files
@@ -837,6 +691,9 @@ def test_aider_runner(
         with pytest.raises(expected_exception):
             aider_runner(str(dir_path), files_by_directory, model, instructions)
     else:
+        # Wait for the rate limiter before the call reaches the remote model, the exception cases above never do
+        api_rate_limiter.wait()
+
         # Call aider_runner with the provided parameters
         aider_runner(str(dir_path), files_by_directory, model, instructions)
 
@@ -850,9 +707,6 @@ def test_aider_runner(
                 if methods is not None:
                     for method in methods:
                         assert method in classes_and_functions[name], f"Expected method '{method}' in class '{name}' in {file_name}"
-        
-        # Add a delay of one second after the else statement to avoid API rate limit issues
-        time.sleep(1)
 
 @pytest.fixture(scope="session", autouse=True)
 def disable_frozen_modules():
@@ -866,16 +720,20 @@ def disable_file_validation():
     yield
     del os.environ["PYDEVD_DISABLE_FILE_VALIDATION"]
 
-@pytest.fixture
-def temp_directory(tmp_path):
+@pytest.fixture(scope="session")
+def _temp_directory_template(tmp_path_factory):
     """
-    Fixture to create a temporary directory structure for testing.
+    Fixture to create the template directory structure once per session.
 
-    Creates multiple directories with normal files and test files.
+    Creates multiple directories with normal files and test files. The temp_directory fixture copies
+    this template into a fresh directory for every test instead of building the files again.
     """
+    # Create the template root directory
+    root = tmp_path_factory.mktemp("template")
+
     # Create main directories
-    dir1 = tmp_path / "dir1"
-    dir2 = tmp_path / "dir2"
+    dir1 = root / "dir1"
+    dir2 = root / "dir2"
     dir1.mkdir()
     dir2.mkdir()
 
@@ -929,8 +787,26 @@ def temp_directory(tmp_path):
     # Makes a simple single assertion to test the subtraction function
     """))
 
+    # Return the template root directory
+    return root
+
+@pytest.fixture
+def temp_directory(_temp_directory_template, tmp_path_factory, worker_id):
+    """
+    Fixture to create a temporary directory structure for testing.
+
+    Copies the session template into a root directory derived from the pytest-xdist worker id, so parallel
+    workers never write into each other's directories. The files are real copies, not hardlinks: aider may edit 
+    any file of the directory (not only the ones listed in files_by_directory), and an edit must never reach 
+    the template that the other test cases copy or read.
+    """
+    # Create a root directory unique to this test and xdist worker ("master" when not running in parallel)
+    root = tmp_path_factory.mktemp(f"exec_{worker_id}")
+    # Copy the template files into the root directory
+    shutil.copytree(_temp_directory_template, root, copy_function=shutil.copy2, dirs_exist_ok=True)
+
     # Yield control to the test function, providing paths to directories
-    directory_paths = [str(dir1), str(dir2)]
+    directory_paths = [str(root / "dir1"), str(root / "dir2")]
     yield {
         "directory_paths": directory_paths
     }
@@ -942,18 +818,190 @@ def temp_directory(tmp_path):
 
 
             
-@pytest.fixture
+@pytest.fixture(scope="session")
 def model():
     """
-    Fixture to create the model instance for testing.
+    Fixture to create the model instance for testing, once per session.
+
+    The model only holds the settings of the OpenRouter model, aider creates a new Coder for every 
+    aider_runner call, so the same instance is shared by every case of test_execute.
 
     Returns:
         Model: An instance of the Model class.
     """
+    from aider.models import Model
     return Model("openrouter/openai/gpt-4o-mini")
 
+# Read-only expected outputs shared by every test_execute case that expects no script or test outputs,
+# a case can't mutate it and leak into the next one
+EMPTY_OUTPUTS = MappingProxyType({})
+
+# Validation cases for the execute function, each of them raises before the remote model is contacted.
+# Every row is tagged with its expected outcome: the exception type and a regex matched against its message,
+# so a row that lands in a different validation branch than intended fails.
+INVALID_CASES = [
+    # Test case 1: Running scripts without recording their output, ValueError raised since record_test_output_values 
+    # needs to be a list of bools when run_tests_flag and test_file_names are provided
+    # - Runs the script without recording its output and does not run any tests.
+    (
+        None,  # directory_paths
+        [["file1.py"]],  # files_by_directory
+        [False],  # record_output_flag
+        [False],  # run_tests_flag
+        [["test_file1.py"]],  # test_file_names
+        None,  # record_test_output_values
+        False,  # verbose
+        ["Modify file1.py to add a function `def added_function(): print('Added function to file1')`"],  # instructions
+        ValueError,  # expected_exception
+        "record_test_output_values must be provided"  # expected_message
+    ),
+    # Test case 2: Running scripts with instructions, ValueError raise since run_tests_flag must be None when test_file_names is None
+    # - Runs the script with specific instructions to modify the script file.
+    (
+        None,  # directory_paths
+        [["file1.py"]],  # files_by_directory
+        [True],  # record_output_flag
+        [False],  # run_tests_flag
+        None,  # test_file_names
+        None,  # record_test_output_values
+        False,  # verbose
+        ["Add a function to file1.py `def added_function(): print('Added function to file1')`"],  # instructions
+        ValueError,  # expected_exception
+        "must be None if test_file_names are None"  # expected_message
+    ),
+    # Test case 3: Running scripts with instructions, ValueError raise since record_test_output_values must be None when test_file_names is None
+    # - Runs the script with specific instructions to modify the script file.
+    (
+        None,  # directory_paths
+        [["file1.py"]],  # files_by_directory
+        [True],  # record_output_flag
+        None,  # run_tests_flag
+        None,  # test_file_names
+        [False],  # record_test_output_values
+        False,  # verbose
+        ["Add a function to file1.py `def added_function(): print('Added function to file1')`"],  # instructions
+        ValueError,  # expected_exception
+        "must be None if test_file_names are None"  # expected_message
+    ),
+    # Test case 4: Running scripts with instructions, ValueError raise since record_test_output_values and run_tests_flag
+    #  must be None when test_file_names is None
+    # - Runs the script with specific instructions to modify the script file.
+    (
+        None,  # directory_paths
+        [["file1.py"]],  # files_by_directory
+        [True],  # record_output_flag
+        [False],  # run_tests_flag
+        None,  # test_file_names
+        [False],  # record_test_output_values
+        False,  # verbose
+        ["Add a function to file1.py `def added_function(): print('Added function to file1')`"],  # instructions
+        ValueError,  # expected_exception
+        "must be None if test_file_names are None"  # expected_message
+    ),
+    # Test case 5: Empty directory paths
+    # - Tests the scenario where the directory paths list is empty, expecting a ValueError.
+    (
+        [],  # directory_paths
+        [],  # files_by_directory
+        [],  # record_output_flag
+        [],  # run_tests_flag
+        None,  # test_file_names
+        None,  # record_test_output_values
+        False,  # verbose
+        None,  # instructions
+        ValueError,  # expected_exception
+        "directory_paths cannot be empty"  # expected_message
+    ),
+    # Test case 6: Invalid directory paths
+    # - Tests the scenario where directory paths contain invalid paths (empty strings), expecting a ValueError.
+    (
+        ["", ""],  # directory_paths
+        [["file1.py"], ["file3.py"]],  # files_by_directory
+        [True, True],  # record_output_flag
+        [False, False],  # run_tests_flag
+        None,  # test_file_names
+        None,  # record_test_output_values
+        False,  # verbose
+        None,  # instructions
+        ValueError,  # expected_exception
+        "directory_paths cannot be empty"  # expected_message
+    ),
+    # Test case 7: Non-boolean record_output_flag
+    # - Tests the scenario where record_output_flag contains a non-boolean value, expecting a ValueError.
+    (
+        None,  # directory_paths
+        [["file1.py"], ["file3.py"]],  # files_by_directory
+        [True, "False"],  # record_output_flag
+        [False, False],  # run_tests_flag
+        None,  # test_file_names
+        None,  # record_test_output_values
+        False,  # verbose
+        None,  # instructions
+        ValueError,  # expected_exception
+        "record_output_flag must contain boolean values"  # expected_message
+    ),
+    # Test case 8: Mismatch in files_by_directory and record_output_flag lengths
+    # - Tests the scenario where the lengths of files_by_directory and record_output_flag do not match, expecting a ValueError.
+    (
+        None,  # directory_paths
+        [["file1.py"], ["file3.py"]],  # files_by_directory
+        [True],  # record_output_flag
+        [False, False],  # run_tests_flag
+        None,  # test_file_names
+        None,  # record_test_output_values
+        False,  # verbose
+        None,  # instructions
+        ValueError,  # expected_exception
+        "Mismatch in the lengths of files_by_directory and record_output_flag"  # expected_message
+    ),
+    # Test case 9: Mismatch in test_file_names, run_tests_flag, and record_test_output_values lengths
+    # - Tests the scenario where the lengths of test_file_names, run_tests_flag, and record_test_output_values do not match, expecting a ValueError.
+    (
+        None,  # directory_paths
+        [["file1.py"], ["file3.py"]],  # files_by_directory
+        [True, True],  # record_output_flag
+        [True, False],  # run_tests_flag
+        [["test_file1.py"], ["test_file3.py"]],  # test_file_names
+        [True],  # record_test_output_values
+        False,  # verbose
+        None,  # instructions
+        ValueError,  # expected_exception
+        "Mismatch in the lengths of test_file_names, run_tests_flag, or record_test_output_values"  # expected_message
+    ),
+    # Test case 10: Invalid list structure
+    # - Tests the scenario where files_by_directory has more sublists than there are directories while the flag lengths match, 
+    #   expecting a ValueError from the list structure check.
+    (
+        None,  # directory_paths
+        [["file1.py"], ["file3.py"], ["file4.py"]],  # files_by_directory
+        [True, True, True],  # record_output_flag
+        None,  # run_tests_flag
+        None,  # test_file_names
+        None,  # record_test_output_values
+        False,  # verbose
+        None,  # instructions
+        ValueError,  # expected_exception
+        "Invalid list structure or lengths between nested lists and directory_paths"  # expected_message
+    ),
+    # Test case 11: Nested empty lists
+    # - Tests the scenario where files_by_directory only contains empty lists and the flag lists are empty to match, 
+    #   expecting a ValueError from the nested empty list check.
+    (
+        None,  # directory_paths
+        [[]],  # files_by_directory
+        [],  # record_output_flag
+        None,  # run_tests_flag
+        None,  # test_file_names
+        None,  # record_test_output_values
+        False,  # verbose
+        None,  # instructions
+        ValueError,  # expected_exception
+        "nested empty list"  # expected_message
+    )
+]
+
 @pytest.mark.parametrize(
-    "directory_paths, files_by_directory, record_output_flag, run_tests_flag, test_file_names, record_test_output_values, verbose, instructions, expected_script_outputs, expected_test_outputs, expected_exception",
+    "directory_paths, files_by_directory, record_output_flag, run_tests_flag, test_file_names, record_test_output_values, verbose, instructions, expected_script_outputs, expected_test_outputs",
     [
         # Test case 1: Basic usage without tests
         # - Runs the scripts in two directories and records their outputs without running any tests.
@@ -976,34 +1024,9 @@ def model():
                 'dir1/file2.py': {'stdout': 'Result of multiply: 20\n', 'stderr': ''},
                 'dir2/file3.py': {'stdout': 'Result of subtract: 2\n', 'stderr': ''}
             },  # expected_script_outputs
-            {},  # expected_test_outputs
-            None  # expected_exception
-        ),
-        # Test case 2: Basic usage without tests with wrong file3.py assertion value
-        # - Runs the scripts in two directories and records their outputs without running any tests.
-        (
-            None,  # directory_paths
-            [["file1.py", "file2.py"], ["file3.py"]],  # files_by_directory
-            [True, True, True],  # record_output_flag
-            None,  # run_tests_flag
-            None,  # test_file_names
-            None,  # record_test_output_values
-            False,  # verbose
-            [
-                ["Modify file1.py to add a function `def add(a, b): return a + b` and include `if __name__ == '__main__': print('Result of add:', add(2, 3))`",
-                 "Modify file2.py to add a function `def multiply(a, b): return a * b` and include `if __name__ == '__main__': print('Result of multiply:', multiply(4, 5))`"
-                ],
-                ["Modify file3.py to add a function `def subtract(a, b): return a - b` and include `if __name__ == '__main__': print('Result of subtract:', subtract(5, 3))`"],       
-            ],  # instructions
-            {
-                'dir1/file1.py': {'stdout': 'Result of add: 5\n', 'stderr': ''},
-                'dir1/file2.py': {'stdout': 'Result of multiply: 18\n', 'stderr': ''},
-                'dir2/file3.py': {'stdout': 'Result of subtract: 2\n', 'stderr': ''}
-            },  # expected_script_outputs
-            {},  # expected_test_outputs
-            AssertionError  # expected_exception
+            EMPTY_OUTPUTS  # expected_test_outputs
         ),
-        # Test case 3: Running scripts and tests with output recording
+        # Test case 2: Running scripts and tests with output recording
         # - Runs the scripts and their corresponding tests, recording both the script and test outputs.
         (
             None,  # directory_paths
@@ -1032,28 +1055,9 @@ def model():
             {
                 'dir1/test_file1.py': {'stdout': '============================= test session starts =============================\nplatform win32 -- Python ...t1/test_file1.py . [100%]\n\n============================== 1 passed in 0.01s ===============================\n', 'stderr': ''},
                 'dir2/test_file3.py': {'stdout': '============================= test session starts =============================\nplatform win32 -- Python ...t2/test_file3.py . [100%]\n\n============================== 1 passed in 0.01s ===============================\n', 'stderr': ''}
-            },  # expected_test_outputs0
-            None  # expected_exception
+            }  # expected_test_outputs
         ),
-        # Test case 4: Running scripts without recording their output since bool lists like record_output_flag, run_tests_flag, record_test_output_values 
-        # needs to be a list of bools 
-        # - Runs the script without recording its output and does not run any tests.
-        (
-            None,  # directory_paths
-            [["file1.py"]],  # files_by_directory
-            [False],  # record_output_flag
-            [False],  # run_tests_flag
-            [["test_file1.py"]],  # test_file_names
-            None,  # record_test_output_values
-            False,  # verbose
-            ["Modify file1.py to add a function `def added_function(): print('Added function to file1')`"],  # instructions
-            {
-                'dir1/file1.py': {'stdout': '', 'stderr': ''}
-            },  # expected_script_outputs
-            {},  # expected_test_outputs
-            TypeError  # expected_exception
-        ),
-        # Test case 5: Running scripts without recording their outputs 
+        # Test case 3: Running scripts without recording their outputs 
         # - Runs the script without recording its output and does not run any tests.
         (
             None,  # directory_paths
@@ -1064,63 +1068,10 @@ def model():
             [False],  # record_test_output_values
             False,  # verbose
             ["Modify file1.py to add a function `def added_function(): print('Added function to file1')`"],  # instructions
-            {},  # expected_script_outputs
-            {},  # expected_test_outputs
-            None  # expected_exception
+            EMPTY_OUTPUTS,  # expected_script_outputs
+            EMPTY_OUTPUTS  # expected_test_outputs
         ),
-        # Test case 6: Running scripts with instructions, ValueError raise since run_tests_flag must be None when test_file_names is None
-        # - Runs the script with specific instructions to modify the script file.
-        (
-            None,  # directory_paths
-            [["file1.py"]],  # files_by_directory
-            [True],  # record_output_flag
-            [False],  # run_tests_flag
-            None,  # test_file_names
-            None,  # record_test_output_values
-            False,  # verbose
-            ["Add a function to file1.py `def added_function(): print('Added function to file1')`"],  # instructions
-            {
-                'dir1/file1.py': {'stdout': 'Hello from file1\nAdded function to file1\n', 'stderr': ''}
-            },  # expected_script_outputs
-            {},  # expected_test_outputs
-            ValueError  # expected_exception
-        ),
-        # Test case 7: Running scripts with instructions, ValueError raise since record_test_output_values must be None when test_file_names is None
-        # - Runs the script with specific instructions to modify the script file.
-        (
-            None,  # directory_paths
-            [["file1.py"]],  # files_by_directory
-            [True],  # record_output_flag
-            None,  # run_tests_flag
-            None,  # test_file_names
-            [False],  # record_test_output_values
-            False,  # verbose
-            ["Add a function to file1.py `def added_function(): print('Added function to file1')`"],  # instructions
-            {
-                'dir1/file1.py': {'stdout': 'Hello from file1\nAdded function to file1\n', 'stderr': ''}
-            },  # expected_script_outputs
-            {},  # expected_test_outputs
-            ValueError  # expected_exception
-        ),
-        # Test case 8: Running scripts with instructions, ValueError raise since record_test_output_values and run_tests_flag
-        #  must be None when test_file_names is None
-        # - Runs the script with specific instructions to modify the script file.
-        (
-            None,  # directory_paths
-            [["file1.py"]],  # files_by_directory
-            [True],  # record_output_flag
-            [False],  # run_tests_flag
-            None,  # test_file_names
-            [False],  # record_test_output_values
-            False,  # verbose
-            ["Add a function to file1.py `def added_function(): print('Added function to file1')`"],  # instructions
-            {
-                'dir1/file1.py': {'stdout': 'Hello from file1\nAdded function to file1\n', 'stderr': ''}
-            },  # expected_script_outputs
-            {},  # expected_test_outputs
-            ValueError  # expected_exception
-        ),
-        # Test case 9: Complex case with mixed settings
+        # Test case 4: Complex case with mixed settings
         # - Demonstrates a complex scenario where different settings are applied for recording output and running tests across directories.
         (
             None,  # directory_paths
@@ -1153,128 +1104,30 @@ def model():
                 'dir1/test_file1.py': {'stdout': '============================= test session starts =============================\nplatf...d in 0.05s ==============================\n', 'stderr': ''},
                 'dir1/test_file2.py': {'stdout': '', 'stderr': ''},
                 'dir2/test_file3.py': {'stdout': '', 'stderr': ''}
-            },  # expected_test_outputs
-            None  # expected_exception
-        ),
-        # Test case 10: Empty directory paths
-        # - Tests the scenario where the directory paths list is empty, expecting a ValueError.
-        (
-            [],  # directory_paths
-            [],  # files_by_directory
-            [],  # record_output_flag
-            [],  # run_tests_flag
-            None,  # test_file_names
-            None,  # record_test_output_values
-            False,  # verbose
-            None,  # instructions
-            {},  # expected_script_outputs
-            {},  # expected_test_outputs
-            ValueError  # expected_exception
-        ),
-        # Test case 11: Invalid directory paths
-        # - Tests the scenario where directory paths contain invalid paths (empty strings), expecting a ValueError.
-        (
-            ["", ""],  # directory_paths
-            [["file1.py"], ["file3.py"]],  # files_by_directory
-            [True, True],  # record_output_flag
-            [False, False],  # run_tests_flag
-            None,  # test_file_names
-            None,  # record_test_output_values
-            False,  # verbose
-            None,  # instructions
-            {},  # expected_script_outputs
-            {},  # expected_test_outputs
-            ValueError  # expected_exception
-        ),
-        # Test case 12: Non-boolean record_output_flag
-        # - Tests the scenario where record_output_flag contains a non-boolean value, expecting a ValueError.
-        (
-            None,  # directory_paths
-            [["file1.py"], ["file3.py"]],  # files_by_directory
-            [True, "False"],  # record_output_flag
-            [False, False],  # run_tests_flag
-            None,  # test_file_names
-            None,  # record_test_output_values
-            False,  # verbose
-            None,  # instructions
-            {},  # expected_script_outputs
-            {},  # expected_test_outputs
-            ValueError  # expected_exception
-        ),
-        # Test case 13: Mismatch in files_by_directory and record_output_flag lengths
-        # - Tests the scenario where the lengths of files_by_directory and record_output_flag do not match, expecting a ValueError.
-        (
-            None,  # directory_paths
-            [["file1.py"], ["file3.py"]],  # files_by_directory
-            [True],  # record_output_flag
-            [False, False],  # run_tests_flag
-            None,  # test_file_names
-            None,  # record_test_output_values
-            False,  # verbose
-            None,  # instructions
-            {},  # expected_script_outputs
-            {},  # expected_test_outputs
-            ValueError  # expected_exception
-        ),
-        # Test case 14: Mismatch in test_file_names, run_tests_flag, and record_test_output_values lengths
-        # - Tests the scenario where the lengths of test_file_names, run_tests_flag, and record_test_output_values do not match, expecting a ValueError.
-        (
-            None,  # directory_paths
-            [["file1.py"], ["file3.py"]],  # files_by_directory
-            [True, True],  # record_output_flag
-            [True, False],  # run_tests_flag
-            [["test_file1.py"], ["test_file3.py"]],  # test_file_names
-            [True],  # record_test_output_values
-            False,  # verbose
-            None,  # instructions
-            {},  # expected_script_outputs
-            {},  # expected_test_outputs
-            ValueError  # expected_exception
-        ),
-        # Test case 15: Invalid list structure or lengths
-        # - Tests the scenario where the structure or lengths of the input lists are invalid, expecting a ValueError.
-        (
-            None,  # directory_paths
-            ["file1.py"],  # files_by_directory
-            [True],  # record_output_flag
-            [False],  # run_tests_flag
-            [["test_file1.py"]],  # test_file_names
-            [False],  # record_test_output_values
-            False,  # verbose
-            None,  # instructions
-            {},  # expected_script_outputs
-            {},  # expected_test_outputs
-            ValueError  # expected_exception
-        ),
-        # Test case 16: Nested empty lists
-        # - Tests the scenario where files_by_directory or test_file_names contain nested empty lists, expecting a ValueError.
-        (
-            None,  # directory_paths
-            [[]],  # files_by_directory
-            [True],  # record_output_flag
-            [False],  # run_tests_flag
-            [[]],  # test_file_names
-            [False],  # record_test_output_values
-            False,  # verbose
-            None,  # instructions
-            {},  # expected_script_outputs
-            {},  # expected_test_outputs
-            ValueError  # expected_exception
+            }  # expected_test_outputs
         )
     ]
 )
-def test_execute(directory_paths, files_by_directory, model, record_output_flag, run_tests_flag, test_file_names, 
+@pytest.mark.vcr
+def test_execute(directory_paths, files_by_directory, record_output_flag, run_tests_flag, test_file_names, 
                 record_test_output_values, verbose, instructions, expected_script_outputs, expected_test_outputs,
-                expected_exception, temp_directory):
+                temp_directory, api_rate_limiter, vcr, vcr_cassette_dir, default_cassette_name, request):
     """
     Test function for the execute function.
 
-    This test covers various scenarios, including normal operations, edge cases, and validation checks.
+    This test covers normal operations that run aider against the remote model. Cases that are expected
+    to fail validation are covered by test_execute_validation. Each case covers a different combination of
+    the record_output_flag, run_tests_flag and record_test_output_values axes (all True, all False, mixed),
+    since every case costs a call to the remote model. Mismatch detection is covered offline by 
+    test_assert_execute_result.
+
+    The calls are replayed from the recorded cassette of the case, so the test runs in the default suite without
+    the network. A case without a cassette (or run with --disable-recording) needs OPENROUTER_API_KEY to record
+    against the remote model and is skipped when the key is not set.
 
     Args:
         directory_paths (List[str]): The directories to process.
         files_by_directory (List[List[str]]): The names of the files to process for each directory.
-        model (Any): The model to use for processing.
         record_output_flag (List[bool]): Flags indicating whether to record the script output for each directory.
         run_tests_flag (List[bool]): Flags indicating whether to run the test files for each directory.
         test_file_names (List[List[str]], optional): The names of the test files to run for each directory. Defaults to None.
@@ -1283,57 +1136,155 @@ def test_execute(directory_paths, files_by_directory, model, record_output_flag,
         instructions (List[str]): The list of instructions to run on the files.
         expected_script_outputs (Dict[str, Any]): Expected script outputs.
         expected_test_outputs (Dict[str, Any]): Expected test outputs.
-        expected_exception (Optional[Type[Exception]]): The type of exception expected to be raised. Defaults to None.
         temp_directory (Fixture): Fixture for the temporary directory structure.
+        api_rate_limiter (Fixture): Shared rate limiter used to space out calls to the remote model.
+        vcr (Fixture): The pytest-recording cassette that records or replays the calls to the remote model, 
+                       None when pytest is run with --disable-recording.
+        vcr_cassette_dir (Fixture): The pytest-recording cassettes directory of this module, e.g. tests/cassettes/test_main.
+        default_cassette_name (Fixture): The pytest-recording cassette name of the case.
+        request (FixtureRequest): Used to build the model fixture once the case is known to run.
     """
+    # Skip when the case would call the remote model without an API key: there is no cassette to replay 
+    # Example: tests/cassettes/test_main/test_execute[1].yaml is missing and OPENROUTER_API_KEY is unset -> skipped
+    cassette_path = os.path.join(vcr_cassette_dir, f"{default_cassette_name}.yaml")
+    if not os.getenv("OPENROUTER_API_KEY") and (vcr is None or not os.path.exists(cassette_path)):
+        pytest.skip(f"no cassette at {cassette_path} and OPENROUTER_API_KEY is not set")
+
+    # The model is only built for the cases that run, aider isn't imported for a skipped case
+    model = request.getfixturevalue("model")
+
     # Use the fixture values as defaults if the parameterized values are None
     if directory_paths is None:
         directory_paths = temp_directory['directory_paths']
         # Example: directory_paths = None, temp_directory['directory_paths'] = ['path1', 'path2'] -> directory_paths = ['path1', 'path2']
-    
-    # Introduce a delay of one second between each parameterized test case to avoid API rate limit issues
-    time.sleep(1)
-    
-    try:
-        # Run the execute function and capture the outputs
-        outputs = execute(directory_paths, files_by_directory, model, record_output_flag, run_tests_flag, test_file_names, record_test_output_values, verbose, instructions)
-        # Example: execute(...) -> {"script_outputs": ["output1", "output2"], "test_outputs": ["test_output1", "test_output2"]}
-    
-        # If an exception was expected but not raised, this is a failure
-        if expected_exception:
-            raise AssertionError(f"Expected exception {expected_exception.__name__} was not raised.")
-            # Example: expected_exception = ValueError, no exception raised -> AssertionError("Expected exception ValueError was not raised.")
-    
-        # Unpack the dictionary of outputs into script_outputs and test_outputs
-        script_outputs, test_outputs = outputs["script_outputs"], outputs["test_outputs"]
-        # Example: outputs = {"script_outputs": ["output1", "output2"], "test_outputs": ["test_output1", "test_output2"]} -> script_outputs = ["output1", "output2"], test_outputs = ["test_output1", "test_output2"]
-    
-        # Adjust script outputs without masking directory paths
-        adjusted_script_outputs = adjust_outputs(script_outputs)
-        # Example: script_outputs = ["output1", "output2"] -> adjusted_script_outputs = ["adjusted_output1", "adjusted_output2"]
-    
-        # Adjust test outputs with masking directory paths
-        adjusted_test_outputs = adjust_outputs(test_outputs)
-        # Example: test_outputs = ["test_output1", "test_output2"] -> adjusted_test_outputs = ["adjusted_test_output1", "adjusted_test_output2"]
-    
-        # Assert script outputs
-        assert assert_outputs(adjusted_script_outputs, expected_script_outputs), "Script output assertion failed."
-        # Example: adjusted_script_outputs = ["adjusted_output1", "adjusted_output2"], expected_script_outputs = ["expected_output1", "expected_output2"] -> assert_outputs(...) = True
-    
-        # Assert test outputs
-        assert assert_outputs(adjusted_test_outputs, expected_test_outputs, is_test=True), "Test output assertion failed."
-        # Example: adjusted_test_outputs = ["adjusted_test_output1", "adjusted_test_output2"], expected_test_outputs = ["expected_test_output1", "expected_test_output2"] -> assert_outputs(...) = True
-    
-    except Exception as e:
-        # If an exception is raised, check if it matches the expected_exception
-        if expected_exception and isinstance(e, expected_exception):
-            print(f"Expected exception {expected_exception.__name__} occurred: {e}")
-            assert True  # The test passes since the correct exception was raised.
-            # Example: expected_exception = ValueError, e = ValueError("error message") -> print("Expected exception ValueError occurred: error message"), assert True
-        else:
-            # If a different exception occurred than expected, or no exception was expected, raise it to indicate a test failure
-            raise
-            # Example: expected_exception = ValueError, e = TypeError("error message") -> raise TypeError("error message")
+
+    # Wait for the rate limiter only when the case is recorded against the remote model, 
+    # a write protected cassette replays the calls from disk. With --disable-recording the vcr fixture is None
+    # and every call goes to the remote model
+    if vcr is None or not vcr.write_protected:
+        api_rate_limiter.wait()
+
+    # Run the execute function and capture the outputs
+    outputs = execute(directory_paths, files_by_directory, model, record_output_flag, run_tests_flag, test_file_names, record_test_output_values, verbose, instructions)
+    # Example: execute(...) -> {"script_outputs": ["output1", "output2"], "test_outputs": ["test_output1", "test_output2"]}
+
+    # Assert the script and test outputs in a single pass over the outputs
+    assert_execute_result(outputs, expected_script_outputs, expected_test_outputs)
+
+def fake_aider_runner(directory: str, files_by_directory: List[str], model: Any, instructions: List[str]) -> None:
+    """
+    Stands in for aider_runner and the LLM behind it by writing a fixed edit to every file.
+
+    Purpose: Lets test_execute_wiring check how execute hands the files and instructions to aider_runner
+    and then runs the edited scripts, in microseconds and without calling the remote model.
+
+    Used in: The test_execute_wiring function, as the side effect of the mocked aider_runner.
+
+    Args:
+        directory (str): The directory path of the files.
+        files_by_directory (List[str]): The file names to edit.
+        model (Any): The model, unused.
+        instructions (List[str]): The instructions, unused.
+
+    Example Usage:
+        >>> fake_aider_runner("/tmp/pytest-198/dir1", ["file1.py"], model, ["x"])
+        # dir1/file1.py now contains: print('edited file1.py')
+    """
+    for file_name in files_by_directory:
+        file_path = Path(directory) / file_name
+        file_path.write_text(f"print('edited {file_name}')\n")
+
+@pytest.mark.parametrize(
+    "instructions, edited_directories, expected_script_outputs",
+    [
+        # Test case 1: Sentinel instructions for both directories
+        # - aider_runner is called once per directory and both edited scripts are run.
+        (
+            [["x"], ["x"]],  # instructions
+            [0, 1],  # edited_directories, indexes into directory_paths
+            {
+                'dir1/file1.py': {'stdout': 'edited file1.py\n', 'stderr': ''},
+                'dir2/file3.py': {'stdout': 'edited file3.py\n', 'stderr': ''}
+            }  # expected_script_outputs
+        ),
+        # Test case 2: Empty instructions for the second directory
+        # - aider_runner is skipped for dir2, its unedited script (only comments) is still run.
+        (
+            [["x"], ""],  # instructions
+            [0],  # edited_directories, indexes into directory_paths
+            {
+                'dir1/file1.py': {'stdout': 'edited file1.py\n', 'stderr': ''},
+                'dir2/file3.py': {'stdout': '', 'stderr': ''}
+            }  # expected_script_outputs
+        )
+    ]
+)
+def test_execute_wiring(instructions, edited_directories, expected_script_outputs, temp_directory):
+    """
+    Test function for how execute wires the instructions to aider_runner and the runner, with the LLM mocked.
+
+    The natural language prompts of test_execute take seconds per case against the remote model, so this test
+    uses short sentinel instructions and replaces aider_runner with a Mock that writes fixed edits
+    (see fake_aider_runner). The real prompts stay in test_execute, which replays them from the recorded cassettes.
+
+    Args:
+        instructions (List[List[str]]): Sentinel instructions for each directory, an empty value skips aider.
+        edited_directories (List[int]): Indexes of the directories aider_runner is expected to be called for.
+        expected_script_outputs (Dict[str, Any]): Expected script outputs.
+        temp_directory (Fixture): Fixture for the temporary directory structure.
+    """
+    directory_paths = temp_directory['directory_paths']
+    files_by_directory = [["file1.py"], ["file3.py"]]
+    # The model is only handed on to the mocked aider_runner, so a sentinel stands in for it and aider is never imported
+    model = object()
+
+    # Replace aider_runner in main.py, execute looks it up when it's called
+    with patch("Aider_Project.main.aider_runner", Mock(side_effect=fake_aider_runner)) as mock_aider_runner:
+        outputs = execute(directory_paths, files_by_directory, model, [True, True], None, None, None, False, instructions)
+
+    # aider_runner receives the directory, its files, the model and its instructions, once per edited directory
+    # Example: [call('/tmp/.../dir1', ['file1.py'], model, ['x'])]
+    assert [call.args for call in mock_aider_runner.call_args_list] == [
+        (directory_paths[i], files_by_directory[i], model, instructions[i]) for i in edited_directories
+    ]
+
+    # The scripts are run after the edits, and no tests are run
+    assert_execute_result(outputs, expected_script_outputs, EMPTY_OUTPUTS)
+
+@pytest.mark.parametrize(
+    "directory_paths, files_by_directory, record_output_flag, run_tests_flag, test_file_names, record_test_output_values, verbose, instructions, expected_exception, expected_message",
+    INVALID_CASES
+)
+def test_execute_validation(directory_paths, files_by_directory, record_output_flag, run_tests_flag, test_file_names,
+                            record_test_output_values, verbose, instructions, expected_exception, expected_message, _temp_directory_template):
+    """
+    Test function for the input validation of the execute function.
+
+    Every case raises before aider or the remote model is called, so no rate limiting is needed and None is passed
+    as the model, which keeps these cases independent of aider. No file is 
+    read or written either, so the cases use the session template directories directly instead of a 
+    per-case copy from temp_directory.
+
+    Args:
+        directory_paths (List[str]): The directories to process.
+        files_by_directory (List[List[str]]): The names of the files to process for each directory.
+        record_output_flag (List[bool]): Flags indicating whether to record the script output for each directory.
+        run_tests_flag (List[bool]): Flags indicating whether to run the test files for each directory.
+        test_file_names (List[List[str]], optional): The names of the test files to run for each directory.
+        record_test_output_values (List[bool], optional): Flags indicating whether to record the test output for each directory.
+        verbose (bool): Whether to print the outputs to the console.
+        instructions (List[str]): The list of instructions to run on the files.
+        expected_exception (Type[Exception]): The type of exception expected to be raised.
+        expected_message (str): Regex matched against the message of the raised exception.
+        _temp_directory_template (Fixture): The session template directory with dir1 and dir2.
+    """
+    # Use the template directories as defaults if the parameterized values are None
+    if directory_paths is None:
+        directory_paths = [str(_temp_directory_template / "dir1"), str(_temp_directory_template / "dir2")]
+
+    # Assert that execute raises the expected exception
+    with pytest.raises(expected_exception, match=expected_message):
+        execute(directory_paths, files_by_directory, None, record_output_flag, run_tests_flag, test_file_names, record_test_output_values, verbose, instructions)
 
 # Run the tests
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
+import os
 import pytest
 import tempfile
 from pathlib import Path
@@ -22,7 +23,8 @@ nested_dir: Creates a nested directory structure within the temporary directory.
 empty_dir: Creates an empty directory within the temporary directory.
 Parameterization:
 
-Tests are parameterized to run with both True and False values for the print_files_flag.
+test_list_files_valid_directory is parameterized to run with both True and False values for the print_files_flag,
+the print tests only run with the flag set to True.
 
 Tests:
 
@@ -30,6 +32,8 @@ test_list_files_valid_directory: Tests listing files in a valid directory.
 test_list_files_invalid_directory: Tests raising a ValueError for an invalid directory.
 test_list_files_empty_directory: Tests listing files in an empty directory.
 test_list_files_nested_directory: Tests listing files in a nested directory.
+test_list_files_recursive: Tests listing the files of every subdirectory level.
+test_list_files_unreadable_subdirectory: Tests skipping a subdirectory that can't be read.
 test_list_files_with_print: Tests listing files with the print_files flag set to True.
 test_list_files_nested_with_print: Tests listing files in a nested directory with the print_files flag set to True.
 '''
@@ -102,8 +106,37 @@ def test_list_files_nested_directory(nested_dir):
     # Check that the result matches the expected list of files
     assert sorted(result) == sorted(expected_files)
 
-@pytest.mark.parametrize("print_files_flag", [False, True])
-def test_list_files_with_print(temp_dir, print_files_flag, capsys):
+# Define a test for listing files in the subdirectories of a directory
+def test_list_files_recursive(temp_dir, nested_dir):
+    # Add a file at the top level and one in a second level of nesting
+    (Path(temp_dir) / 'file0.txt').touch()
+    deeper_dir = nested_dir / 'deeper'
+    deeper_dir.mkdir()
+    (deeper_dir / 'file3.txt').touch()
+    # Call list_files on the top level directory, the files of every level are listed but not the directories
+    result = list_files(temp_dir)
+    assert sorted(result) == ['file0.txt', 'file1.txt', 'file2.txt', 'file3.txt']
+
+# The False value of the print_files flag is covered by test_list_files_valid_directory and test_list_files_nested_directory,
+# so the print tests only run with the flag set to True and always read the captured output
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() == 0, 
+                    reason="needs POSIX permissions, root can read any directory")
+def test_list_files_unreadable_subdirectory(temp_dir):
+    """
+    Test that list_files skips a subdirectory it can't read and still lists the other files.
+    """
+    (Path(temp_dir) / "file1.txt").touch()
+    private = Path(temp_dir) / "private"
+    private.mkdir()
+    (private / "secret.txt").touch()
+    private.chmod(0)
+    try:
+        assert list_files(temp_dir) == ["file1.txt"]
+    finally:
+        # Restore the permissions so the temporary directory can be cleaned up
+        private.chmod(0o755)
+
+def test_list_files_with_print(temp_dir, capsys):
     """Test listing files with the print_files flag set to True."""
     # Create a file named 'file1.txt' in the temporary directory
     file1 = Path(temp_dir) / 'file1.txt'
@@ -113,34 +146,28 @@ def test_list_files_with_print(temp_dir, print_files_flag, capsys):
     file1.touch()
     file2.touch()
 
-    # Call the list_files function to list files in the temporary directory
-    # The print_files_flag controls whether the function prints the file names
-    list_files(temp_dir, print_files_flag)
-
-    # If we are supposed to print the file names (print_files_flag is True)
-    if print_files_flag:
-        # Capture the output printed to the console
-        captured = capsys.readouterr()
-        # Check if the output includes the expected introductory text
-        assert 'Files in the directory:' in captured.out
-        # Verify that the name of the first file appears in the output
-        assert 'file1.txt' in captured.out
-        # Verify that the name of the second file also appears in the output
-        assert 'file2.txt' in captured.out
+    # Call the list_files function to list and print the files in the temporary directory
+    list_files(temp_dir, True)
 
-@pytest.mark.parametrize("print_files_flag", [False, True])
-def test_list_files_nested_with_print(nested_dir, print_files_flag, capsys):
+    # Capture the output printed to the console
+    captured = capsys.readouterr()
+    # Check if the output includes the expected introductory text
+    assert 'Files in the directory:' in captured.out
+    # Verify that the name of the first file appears in the output
+    assert 'file1.txt' in captured.out
+    # Verify that the name of the second file also appears in the output
+    assert 'file2.txt' in captured.out
+
+def test_list_files_nested_with_print(nested_dir, capsys):
     """Test listing files in a nested directory with the print_files flag set to True."""
-    # Call the list_files function with the nested_dir directory and the print_files_flag
-    list_files(nested_dir, print_files_flag)
+    # Call the list_files function to list and print the files in the nested_dir directory
+    list_files(nested_dir, True)
     
-    # If print_files_flag is True, meaning we want to print the file names to the console
-    if print_files_flag:
-        # Capture the printed output from the console
-        captured = capsys.readouterr()
-        # Check if the output contains the expected introductory text
-        assert 'Files in the directory:' in captured.out
-        # Check if the name of the first file is in the output
-        assert 'file1.txt' in captured.out
-        # Check if the name of the second file is in the output
-        assert 'file2.txt' in captured.out
+    # Capture the printed output from the console
+    captured = capsys.readouterr()
+    # Check if the output contains the expected introductory text
+    assert 'Files in the directory:' in captured.out
+    # Check if the name of the first file is in the output
+    assert 'file1.txt' in captured.out
+    # Check if the name of the second file is in the output
+    assert 'file2.txt' in captured.out